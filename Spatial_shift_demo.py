@@ -1,28 +1,167 @@
 # SPATIAL LOGIC PROTOCOL - Phase 1 Demo
 # Demonstrating the 'Address is the Computation' principle.
 
+from collections import OrderedDict
+from numbers import Number
+
+try:
+    import numpy as np
+except ImportError:  # get_values falls back to pure Python
+    np = None
+
+from spatial_backends import get_backend
+
+
 class Type1Grid:
-    def __init__(self):
+    def __init__(self, levels=None, default=1, cache_size=4096, backend=None):
+        """
+        `levels` maps level -> factor. A factor can be:
+          * a number: the level multiplies (x40, x1600, ...)
+          * a lookup table (list, tuple, ndarray or dict): the level reads
+            table[data], e.g. a LUT or an S-box
+          * a callable: the level computes factor(data); results are
+            memoized in a bounded LRU cache of `cache_size` entries
+        Unknown levels use `default` as factor (None raises KeyError).
+        Numeric factors are applied through a spatial_backends backend
+        (`backend` name or instance; None picks it at runtime).
+        """
         # Level 1 is Identity (x1), Level 2 is the Resonance Platform (x40)
-        self.levels = {1: 1, 2: 40}
+        self.levels = levels if levels is not None else {1: 1, 2: 40}
+        self.default = default
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        self.backend = get_backend(backend)
         print("--- Type 1 Spatial Grid Initialized ---")
 
+    def _factor(self, level):
+        factor = self.levels.get(level, self.default)
+        if factor is None:
+            raise KeyError(level)
+        return factor
+
+    def _memoized(self, level, function, data):
+        """factor(data) through the LRU cache; keys are (level, data)."""
+        key = (level, data)
+        try:
+            value = self._cache[key]
+        except KeyError:
+            pass
+        except TypeError:  # Unhashable data cannot be cached
+            return function(data)
+        else:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return value
+
+        self.cache_misses += 1
+        value = function(data)
+        if self.cache_size > 0:
+            self._cache[key] = value
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.cache_evictions += 1
+        return value
+
+    def cache_info(self):
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "evictions": self.cache_evictions,
+            "size": len(self._cache),
+            "maxsize": self.cache_size,
+        }
+
+    def clear_cache(self):
+        """Call after replacing a callable level: cached results are keyed by level."""
+        self._cache.clear()
+
     def get_value(self, data, level):
         # The computation is a result of the data's POSITION (Level)
-        multiplier = self.levels.get(level, 1)
-        return data * multiplier
+        multiplier = self._factor(level)
+        if isinstance(multiplier, Number):
+            return self.backend.scale(data, multiplier)
+        if callable(multiplier):
+            return self._memoized(level, multiplier, data)
+        return multiplier[data]
+
+    def get_values(self, data_array, level_array):
+        """
+        Vectorized get_value for mixed levels: data_array[i] is read at
+        level_array[i] (a single level is broadcast). Scalar levels are one
+        multiplication per level, array tables one np.take, and callables
+        are evaluated once per distinct value through the cache.
+        """
+        if np is None:
+            if not isinstance(level_array, (list, tuple)):
+                level_array = [level_array] * len(data_array)
+            return [self.get_value(d, l) for d, l in zip(data_array, level_array)]
+
+        data, levels = np.broadcast_arrays(np.asarray(data_array), np.asarray(level_array))
+        shape = data.shape
+        if data.size == 0:
+            return np.empty(shape, dtype=data.dtype)  # No levels to read
+        data, levels = data.ravel(), levels.ravel()
+        unique_levels, inverse = np.unique(levels, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(unique_levels) + 1))
+
+        parts = []
+        for i, level in enumerate(unique_levels.tolist()):
+            idx = order[bounds[i]:bounds[i + 1]]
+            parts.append((idx, self._level_values(level, data[idx])))
+
+        # One shared dtype only when every level agrees on a numeric one;
+        # otherwise an object array keeps each value as get_value() returns it
+        dtypes = {values.dtype for _, values in parts}
+        dtype = dtypes.pop() if len(dtypes) == 1 else np.dtype(object)
+        if dtype.kind not in "biufc":
+            dtype = np.dtype(object)
+        out = np.empty(data.shape, dtype=dtype)
+        for idx, values in parts:
+            out[idx] = values
+        return out.reshape(shape)
+
+    def _level_values(self, level, values):
+        factor = self._factor(level)
+        if isinstance(factor, Number):
+            return np.asarray(self.backend.scale_many(values, factor))
+        if callable(factor):
+            distinct, inverse = np.unique(values, return_inverse=True)
+            results = _column([self._memoized(level, factor, v) for v in distinct.tolist()])
+            return results[inverse.reshape(-1)]
+        if isinstance(factor, dict):
+            return _column([factor[v] for v in values.tolist()])
+        return np.take(np.asarray(factor), values)
+
+
+def _column(results):
+    """1-D array of results; tuples, lists and other sequences stay single objects."""
+    try:
+        column = np.array(results)
+    except ValueError:  # Ragged sequences
+        column = None
+    if column is None or column.ndim != 1:
+        column = np.empty(len(results), dtype=object)
+        for i, result in enumerate(results):
+            column[i] = result
+    return column
+
 
-# --- SIMULATION ---
-grid = Type1Grid()
+if __name__ == "__main__":
+    # --- SIMULATION ---
+    grid = Type1Grid()
 
-# Starting value
-input_data = 5 
-print(f"Initial Data: {input_data} at Level 1")
+    # Starting value
+    input_data = 5
+    print(f"Initial Data: {input_data} at Level 1")
 
-# Standard Type 0 logic would require a CPU multiplication cycle: 5 * 40
-# Type 1 logic simply 'routes' the data to Level 2
-result = grid.get_value(input_data, level=2)
+    # Standard Type 0 logic would require a CPU multiplication cycle: 5 * 40
+    # Type 1 logic simply 'routes' the data to Level 2
+    result = grid.get_value(input_data, level=2)
 
-print(f"Spatial Shift to Level 2 Complete.")
-print(f"Resulting Value (5 x 40): {result}")
-print("--- Thermal Friction: ZERO ---")
+    print(f"Spatial Shift to Level 2 Complete.")
+    print(f"Resulting Value (5 x 40): {result}")
+    print("--- Thermal Friction: ZERO ---")
@@ -0,0 +1,359 @@
+"""
+BENCHMARK SUITE: Wall-clock throughput of the simulation models
+Measures the hot paths of TraditionalComputer, VolumetricBox, SpatialContainer
+and Type1Grid across input sizes, with warmups, repeats and percentiles.
+
+Usage:
+    python benchmark_suite.py                           # table on stdout
+    python benchmark_suite.py --output baseline.json    # save machine-readable results
+    python benchmark_suite.py --baseline baseline.json  # exit 1 on regressions
+    python benchmark_suite.py --memory                  # bytes per op / per box
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from efficiency_demo import EnergyCost, EnergyLedger, TraditionalComputer, VolumetricBox
+
+# Los demos de Phase 1/2 viven en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from volumetric_box_demo import SpatialContainer  # noqa: E402
+from Spatial_shift_demo import Type1Grid  # noqa: E402
+
+# ============================================================================
+# 1. CASOS DE BENCHMARK
+# Cada caso recibe `size` y devuelve una función sin argumentos que ejecuta
+# `size` operaciones; la preparación (setup) queda fuera del tiempo medido.
+# ============================================================================
+
+def _positions(size: int) -> np.ndarray:
+    idx = np.arange(size)
+    return np.column_stack((idx % 100, idx // 100))
+
+
+def case_multiply(size: int) -> Callable:
+    computer = TraditionalComputer()
+    values = list(range(1, size + 1))
+
+    def run():
+        for val in values:
+            computer.multiply(val, 40)
+    return run
+
+
+def case_batch_multiply(size: int) -> Callable:
+    computer = TraditionalComputer()
+    values = np.arange(1, size + 1)
+    return lambda: computer.batch_multiply(values, 40)
+
+
+def _box_case(storage: str, method: str) -> Callable:
+    def setup(size: int) -> Callable:
+        box = VolumetricBox(storage=storage)
+        positions = _positions(size)
+        box.batch_place(np.arange(1, size + 1), positions, level=1)
+        coords = positions.tolist()
+
+        if method == "place_value":
+            def run():
+                for i, (x, y) in enumerate(coords):
+                    box.place_value(i, x, y, 1)
+        elif method == "shift_level":
+            def run():
+                for x, y in coords:
+                    box.shift_level(x, y, 1, 2)
+        else:
+            def run():
+                box.batch_shift(positions, 1, 2)
+        return run
+    return setup
+
+
+def case_process_task(size: int) -> Callable:
+    container = SpatialContainer()
+    box_ids = [f"box_{i}" for i in range(size)]
+    container.register_boxes(box_ids, [1 + i % 3 for i in range(size)])
+
+    def run():
+        for box_id in box_ids:
+            container.process_task(box_id, 10)
+    return run
+
+
+def case_get_value(size: int) -> Callable:
+    grid = Type1Grid()
+    levels = [1 + i % 2 for i in range(size)]
+
+    def run():
+        for i, level in enumerate(levels):
+            grid.get_value(i, level)
+    return run
+
+
+CASES: Dict[str, Callable] = {
+    "TraditionalComputer.multiply": case_multiply,
+    "TraditionalComputer.batch_multiply": case_batch_multiply,
+    "VolumetricBox[dict].place_value": _box_case("dict", "place_value"),
+    "VolumetricBox[dict].shift_level": _box_case("dict", "shift_level"),
+    "VolumetricBox[dict].batch_shift": _box_case("dict", "batch_shift"),
+    "VolumetricBox[dense].place_value": _box_case("dense", "place_value"),
+    "VolumetricBox[dense].shift_level": _box_case("dense", "shift_level"),
+    "VolumetricBox[dense].batch_shift": _box_case("dense", "batch_shift"),
+    "SpatialContainer.process_task": case_process_task,
+    "Type1Grid.get_value": case_get_value,
+}
+
+# ============================================================================
+# 2. MEDICIÓN
+# ============================================================================
+
+def measure(setup: Callable, size: int, repeats: int = 7, warmup: int = 2) -> Dict:
+    """
+    Mide un caso: `warmup` ejecuciones descartadas y `repeats` medidas con
+    perf_counter_ns. Cada repetición usa un objeto nuevo (setup no se mide
+    y su salida se descarta), así el estado acumulado no contamina las
+    siguientes.
+    """
+    def quiet_setup():
+        # Algunos constructores imprimen (Type1Grid); no debe ensuciar la salida
+        with redirect_stdout(io.StringIO()):
+            return setup(size)
+
+    for _ in range(warmup):
+        quiet_setup()()
+
+    samples = []
+    for _ in range(repeats):
+        run = quiet_setup()
+        start = time.perf_counter_ns()
+        run()
+        samples.append((time.perf_counter_ns() - start) / size)
+
+    per_op = np.array(samples)
+    p50 = float(np.percentile(per_op, 50))
+    return {
+        "size": size,
+        "repeats": repeats,
+        "warmup": warmup,
+        "ns_per_op": {
+            "min": float(per_op.min()),
+            "mean": float(per_op.mean()),
+            "stdev": float(per_op.std(ddof=1)) if repeats > 1 else 0.0,
+            "p50": p50,
+            "p90": float(np.percentile(per_op, 90)),
+            "p99": float(np.percentile(per_op, 99)),
+        },
+        "ops_per_sec": 1e9 / p50 if p50 > 0 else float("inf"),
+    }
+
+
+def run_suite(sizes: List[int], repeats: int = 7, warmup: int = 2,
+              name_filter: str = None) -> Dict:
+    """Ejecuta todos los casos (o los que contengan `name_filter`)"""
+    results = []
+    for name, setup in CASES.items():
+        if name_filter and name_filter not in name:
+            continue
+        for size in sizes:
+            result = measure(setup, size, repeats=repeats, warmup=warmup)
+            results.append(dict(name=name, **result))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "repeats": repeats,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, tolerance: float = 0.20) -> List[Dict]:
+    """
+    Compara la mediana (p50 ns/op) de cada (caso, tamaño) contra la línea
+    base. Devuelve las regresiones: casos más lentos que baseline × (1 + tolerance).
+    """
+    reference = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        base = reference.get((result["name"], result["size"]))
+        if base is None:
+            continue
+        ratio = result["ns_per_op"]["p50"] / base["ns_per_op"]["p50"]
+        if ratio > 1 + tolerance:
+            regressions.append({"name": result["name"], "size": result["size"],
+                                "baseline_p50": base["ns_per_op"]["p50"],
+                                "current_p50": result["ns_per_op"]["p50"],
+                                "ratio": ratio})
+    return regressions
+
+
+def print_report(suite: Dict):
+    print(f"{'Caso':40s} {'n':>7s} {'p50 ns/op':>11s} {'p90':>10s} {'p99':>10s} {'ops/s':>13s}")
+    print("-" * 96)
+    for r in suite["results"]:
+        ns = r["ns_per_op"]
+        print(f"{r['name']:40s} {r['size']:7d} {ns['p50']:11.1f} {ns['p90']:10.1f} "
+              f"{ns['p99']:10.1f} {r['ops_per_sec']:13,.0f}")
+
+# ============================================================================
+# 3. MEMORIA
+# Bytes por entrada del log de energía y por registro de caja, con la
+# representación anterior (tupla por entrada, dict por caja) y la actual
+# (columnas array internadas).
+# ============================================================================
+
+def _traced_bytes(build: Callable) -> int:
+    """Bytes que siguen asignados tras build() (el resultado se mantiene vivo)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def _ledger_ops(size: int):
+    energy = EnergyCost()
+    cycle = [("FETCH_MULT_INSTR", energy.FETCH_INSTRUCTION),
+             ("READ_OPERAND_A", energy.READ_MEMORY),
+             ("READ_OPERAND_B", energy.READ_MEMORY),
+             ("INTEGER_MULTIPLY", energy.INTEGER_MULT),
+             ("WRITE_RESULT", energy.WRITE_MEMORY)]
+    return [cycle[i % len(cycle)] for i in range(size)]
+
+
+def memory_ledger(size: int) -> Dict:
+    ops = _ledger_ops(size)
+
+    def before():
+        log = []
+        for operation, cost in ops:
+            log.append((operation, cost))
+        return log
+
+    def after():
+        ledger = EnergyLedger("log")
+        for operation, cost in ops:
+            ledger.add(operation, cost)
+        return ledger
+
+    return {"before": _traced_bytes(before), "after": _traced_bytes(after)}
+
+
+def memory_boxes(size: int) -> Dict:
+    box_ids = [f"box_{i}" for i in range(size)]
+    levels = [1 + i % 3 for i in range(size)]
+    multipliers = {1: 1, 2: 40, 3: 1600}
+
+    def before():
+        return {box_id: {"level": level, "multiplier": multipliers[level]}
+                for box_id, level in zip(box_ids, levels)}
+
+    def after():
+        container = SpatialContainer()
+        container.register_boxes(box_ids, levels)
+        return container
+
+    return {"before": _traced_bytes(before), "after": _traced_bytes(after)}
+
+
+MEMORY_CASES: Dict[str, Callable] = {
+    "EnergyLedger[log] bytes/op": memory_ledger,
+    "SpatialContainer bytes/box": memory_boxes,
+}
+
+
+def run_memory_suite(sizes: List[int]) -> List[Dict]:
+    results = []
+    for name, case in MEMORY_CASES.items():
+        for size in sizes:
+            measured = case(size)
+            results.append({"name": name, "size": size,
+                            "before_bytes_per_item": measured["before"] / size,
+                            "after_bytes_per_item": measured["after"] / size,
+                            "ratio": measured["before"] / max(1, measured["after"])})
+    return results
+
+
+def print_memory_report(results: List[Dict]):
+    print(f"{'Caso':40s} {'n':>9s} {'antes B':>9s} {'ahora B':>9s} {'ratio':>7s}")
+    print("-" * 78)
+    for r in results:
+        print(f"{r['name']:40s} {r['size']:9d} {r['before_bytes_per_item']:9.1f} "
+              f"{r['after_bytes_per_item']:9.1f} {r['ratio']:6.1f}x")
+
+# ============================================================================
+# EJECUCIÓN PRINCIPAL
+# ============================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de throughput de los modelos")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--filter", dest="name_filter", help="solo casos que contengan este texto")
+    parser.add_argument("--output", help="guardar resultados JSON en este archivo")
+    parser.add_argument("--baseline", help="JSON de referencia para detectar regresiones")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="margen de regresión sobre p50 (0.20 = 20%%)")
+    parser.add_argument("--json", action="store_true", help="imprimir JSON en stdout en vez de la tabla")
+    parser.add_argument("--memory", action="store_true",
+                        help="medir bytes por operación/caja en vez de throughput")
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        results = run_memory_suite(args.sizes)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        if args.json:
+            json.dump(results, sys.stdout, indent=2)
+            print()
+        else:
+            print_memory_report(results)
+        return 0
+
+    suite = run_suite(args.sizes, repeats=args.repeats, warmup=args.warmup,
+                      name_filter=args.name_filter)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(suite, f, indent=2)
+    if args.json:
+        json.dump(suite, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(suite)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(suite, baseline, args.tolerance)
+        for reg in regressions:
+            print(f"REGRESIÓN {reg['name']} n={reg['size']}: "
+                  f"{reg['baseline_p50']:.1f} -> {reg['current_p50']:.1f} ns/op "
+                  f"({reg['ratio']:.2f}x)", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,19 +3,53 @@ EFFICIENCY DEMONSTRATION: Volumetric Box Virtual Model
 Quantifying the energy advantage of ontological storage vs traditional computing.
 """
 
+import os
+import json
+import math
+import argparse
 import time
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict
+from itertools import repeat
+from collections import deque
+from collections.abc import Sequence
+from array import array
+import importlib.util
 import sys
 
+_get_backend = None
+
+
+def _spatial_backend(backend=None):
+    """
+    get_backend() de spatial_backends, que vive en la raíz del repositorio.
+    Se importa al crear el primer VolumetricBox; si la raíz no está en
+    sys.path, el módulo se carga desde su archivo sin modificar sys.path.
+    """
+    global _get_backend
+    if _get_backend is None:
+        try:
+            import spatial_backends
+        except ImportError:
+            path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "spatial_backends.py")
+            spec = importlib.util.spec_from_file_location("spatial_backends", path)
+            spatial_backends = importlib.util.module_from_spec(spec)
+            sys.modules["spatial_backends"] = spatial_backends
+            spec.loader.exec_module(spatial_backends)
+        _get_backend = spatial_backends.get_backend
+    return _get_backend(backend)
+
+
 # ============================================================================
 # 1. MODELOS DE ENERGÍA PARA OPERACIONES TRADICIONALES
 # (Basado en datos reales de consumo energético)
 # ============================================================================
 
-@dataclass
+@dataclass(frozen=True)
 class EnergyCost:
     """Costos energéticos basados en arquitectura von Neumann actual"""
     # Valores en picojoules (pJ) por operación
@@ -28,71 +62,1101 @@ class EnergyCost:
     CACHE_MISS: float = 200.0            # 200 pJ (acceso a RAM principal)
     CONTEXT_SWITCH: float = 1000.0       # 1000 pJ
 
+
+class LedgerLog(Sequence):
+    """
+    Vista de solo lectura del log compacto de un EnergyLedger: cada entrada
+    es el código de un par (operation, cost) y se materializa como tupla
+    solo al leerla.
+    """
+
+    __slots__ = ("_pairs", "_ops")
+
+    def __init__(self, pairs: List[tuple], ops: array):
+        self._pairs = pairs
+        self._ops = ops
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._pairs[op] for op in self._ops[index]]
+        return self._pairs[self._ops[index]]
+
+    def __iter__(self):
+        return map(self._pairs.__getitem__, self._ops)
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"LedgerLog({len(self)} entries)"
+
+
+class EnergySketch:
+    """
+    Sketch de cuantiles en streaming (estilo DDSketch): cada costo cae en un
+    bucket logarítmico de razón gamma = (1 + a) / (1 - a), así cualquier
+    cuantil tiene error relativo <= a con memoria O(log(max/min)), no O(n).
+    Los costos <= 0 se cuentan aparte (bucket cero).
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self.buckets = {}       # índice -> nº de valores
+        self.zero_count = 0
+        self.count = 0
+        self._keys = {}         # costo -> índice (los costos se repiten mucho)
+
+    def add(self, value: float, count: int = 1):
+        self.count += count
+        if value <= 0:
+            self.zero_count += count
+            return
+        key = self._keys.get(value)
+        if key is None:
+            if len(self._keys) > 4096:
+                self._keys.clear()
+            key = self._keys[value] = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def copy(self) -> "EnergySketch":
+        other = EnergySketch(self.relative_accuracy)
+        other.buckets = dict(self.buckets)
+        other.zero_count = self.zero_count
+        other.count = self.count
+        return other
+
+    def subtract(self, older: "EnergySketch") -> "EnergySketch":
+        """Valores añadidos desde `older` (una copia anterior de este sketch)"""
+        delta = EnergySketch(self.relative_accuracy)
+        for key, count in self.buckets.items():
+            count -= older.buckets.get(key, 0)
+            if count:
+                delta.buckets[key] = count
+        delta.zero_count = self.zero_count - older.zero_count
+        delta.count = self.count - older.count
+        return delta
+
+    def quantile(self, q: float) -> float:
+        """Cuantil q en [0, 1] (None si el sketch está vacío)"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Punto medio (relativo) del bucket (gamma^(k-1), gamma^k]
+                return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return 2 * math.exp(max(self.buckets) * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+    def percentiles(self) -> Dict:
+        return {"p50": self.quantile(0.50), "p90": self.quantile(0.90), "p99": self.quantile(0.99)}
+
+    def to_dict(self) -> Dict:
+        return {"relative_accuracy": self.relative_accuracy, "zero_count": self.zero_count,
+                "buckets": sorted(self.buckets.items())}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EnergySketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.buckets = {int(key): count for key, count in data["buckets"]}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
+
+
+class EnergyLedger:
+    """
+    Contabilidad de energía por tipo de operación.
+
+    accounting="log"      -> guarda cada (operation, cost), como siempre
+                             (útil para depurar, memoria O(n)); cada entrada
+                             es el código del par en una columna
+                             array('B'/'H'/'I'), ~1 byte por entrada mientras
+                             haya menos de 256 pares distintos
+    accounting="counters" -> solo contadores, memoria O(1); con
+                             trace_size > 0 conserva las últimas entradas
+                             en un buffer circular
+    Lo único que add() actualiza es un contador por par (operation, cost).
+    Totales, contadores, energía por tipo y el EnergySketch de costos se
+    derivan de esos contadores al leerlos, con costo O(pares distintos) y
+    sin recorrer el historial.
+    snapshot()/diff(prev) dan deltas y percentiles de una ventana.
+    """
+
+    MAX_PAIRS = 4096    # counters: pares distintos antes de plegarlos por tipo
+
+    def __init__(self, accounting: str = "log", trace_size: int = 0):
+        if accounting not in ("log", "counters"):
+            raise ValueError(f"accounting desconocido: {accounting!r} (use 'log' o 'counters')")
+        self.accounting = accounting
+        self._ops = array("B") if accounting == "log" else None
+        self._trace = deque(maxlen=trace_size) if accounting == "counters" and trace_size else None
+        self._reset_pairs()
+        # Pares ya plegados (counters con costos muy variados): totales por tipo
+        self._folded_counts = {}
+        self._folded_energy = {}
+        self._folded_sketch = EnergySketch()
+
+    def _reset_pairs(self):
+        self._codes = {}            # (operation, cost) -> código
+        self._pairs = []            # código -> (operation, cost)
+        self._pair_counts = []      # código -> nº de veces
+
+    def _new_code(self, pair: tuple) -> int:
+        if self._ops is None and len(self._pairs) >= self.MAX_PAIRS:
+            self.fold_pairs()
+        code = self._codes[pair] = len(self._pairs)
+        self._pairs.append(pair)
+        self._pair_counts.append(0)
+        if self._ops is not None and code in (256, 65536):
+            # Más pares de los que caben en la columna: se ensancha
+            self._ops = array("H" if code == 256 else "I", self._ops)
+        return code
+
+    def fold_pairs(self):
+        """
+        Pliega los contadores por par en totales por tipo y en el sketch, y
+        libera los pares. En modo log no se usa: el log necesita los pares.
+        """
+        if self._ops is not None:
+            raise RuntimeError("fold_pairs() solo aplica a accounting='counters'")
+        for (operation, cost), count in zip(self._pairs, self._pair_counts):
+            self._folded_counts[operation] = self._folded_counts.get(operation, 0) + count
+            self._folded_energy[operation] = self._folded_energy.get(operation, 0.0) + cost * count
+            self._folded_sketch.add(cost, count)
+        self._reset_pairs()
+
+    def _pairs_sketch(self) -> EnergySketch:
+        sketch = EnergySketch(self._folded_sketch.relative_accuracy)
+        for (_, cost), count in zip(self._pairs, self._pair_counts):
+            sketch.add(cost, count)
+        return sketch
+
+    @property
+    def sketch(self) -> EnergySketch:
+        """Sketch de costos por operación, construido al leerlo (un objeto nuevo)"""
+        sketch = self._pairs_sketch()
+        for key, count in self._folded_sketch.buckets.items():
+            sketch.buckets[key] = sketch.buckets.get(key, 0) + count
+        sketch.zero_count += self._folded_sketch.zero_count
+        sketch.count += self._folded_sketch.count
+        return sketch
+
+    @property
+    def log(self):
+        """Entradas (operation, cost): el log completo o el buffer circular"""
+        if self._ops is not None:
+            return LedgerLog(self._pairs, self._ops)
+        return self._trace if self._trace is not None else deque(maxlen=0)
+
+    @property
+    def counts(self) -> Dict:
+        """operation -> nº de veces"""
+        counts = dict(self._folded_counts)
+        for (operation, _), count in zip(self._pairs, self._pair_counts):
+            counts[operation] = counts.get(operation, 0) + count
+        return counts
+
+    @property
+    def energy_by_type(self) -> Dict:
+        """operation -> pJ acumulados"""
+        energy = dict(self._folded_energy)
+        for (operation, cost), count in zip(self._pairs, self._pair_counts):
+            energy[operation] = energy.get(operation, 0.0) + cost * count
+        return energy
+
+    @property
+    def total_energy(self) -> float:
+        return (sum(self._folded_energy.values())
+                + sum(cost * count for (_, cost), count in zip(self._pairs, self._pair_counts)))
+
+    @property
+    def operations_count(self) -> int:
+        return sum(self._folded_counts.values()) + sum(self._pair_counts)
+
+    def add(self, operation: str, cost: float):
+        pair = (operation, cost)
+        code = self._codes.get(pair)
+        if code is None:
+            code = self._new_code(pair)
+        self._pair_counts[code] += 1
+        if self._ops is not None:
+            self._ops.append(code)
+        elif self._trace is not None:
+            self._trace.append(pair)
+
+    def add_bulk(self, operation: str, cost: float, count: int):
+        """Registra `count` operaciones idénticas de una vez"""
+        if count <= 0:
+            return
+        pair = (operation, cost)
+        code = self._codes.get(pair)
+        if code is None:
+            code = self._new_code(pair)
+        self._pair_counts[code] += count
+        if self._ops is not None:
+            self._ops.extend(array(self._ops.typecode, [code]) * count)
+        elif self._trace is not None:
+            self._trace.extend(repeat(pair, min(count, self._trace.maxlen)))
+
+    def summary(self) -> Dict:
+        """Totales y contadores (serializable, sin el log detallado)"""
+        # Solo los pares vivos: lo plegado es la diferencia con los totales
+        tally = [[operation, cost, count]
+                 for (operation, cost), count in zip(self._pairs, self._pair_counts) if count]
+        return {
+            "total_energy": self.total_energy,
+            "operations_count": self.operations_count,
+            "counts": self.counts,
+            "energy_by_type": self.energy_by_type,
+            "tally": tally,
+            "sketch": self.sketch.to_dict(),
+        }
+
+    def restore(self, summary: Dict):
+        """Continúa la contabilidad a partir de un summary() guardado"""
+        self._reset_pairs()
+        # Summaries anteriores a "tally" se restauran enteros como plegados
+        for operation, cost, count in summary.get("tally", []):
+            pair = (operation, cost)
+            code = self._codes.get(pair)
+            if code is None:
+                code = self._new_code(pair)
+            self._pair_counts[code] += count
+        live_counts, live_energy = self.counts, self.energy_by_type
+        self._folded_counts = {}
+        self._folded_energy = {}
+        for operation, count in summary["counts"].items():
+            count -= live_counts.get(operation, 0)
+            if count:
+                self._folded_counts[operation] = count
+                self._folded_energy[operation] = (summary["energy_by_type"][operation]
+                                                  - live_energy.get(operation, 0.0))
+        self._folded_sketch = EnergySketch()
+        if "sketch" in summary:     # summaries guardados antes del sketch no lo traen
+            saved = EnergySketch.from_dict(summary["sketch"])
+            self._folded_sketch = saved.subtract(self._pairs_sketch())
+
+    def percentiles(self) -> Dict:
+        """Percentiles p50/p90/p99 de la energía por operación (pJ)"""
+        return self.sketch.percentiles()
+
+    def snapshot(self) -> Dict:
+        """Estado actual de los contadores, para comparar después con diff()"""
+        return {
+            "time": time.perf_counter(),
+            "total_energy": self.total_energy,
+            "operations_count": self.operations_count,
+            "counts": dict(self.counts),
+            "energy_by_type": dict(self.energy_by_type),
+            "sketch": self.sketch,
+        }
+
+    def diff(self, prev: Dict, current: Dict = None) -> Dict:
+        """
+        Actividad entre el snapshot `prev` y `current` (por defecto, ahora):
+        deltas de energía y operaciones, tasas por segundo y percentiles de
+        la energía por operación dentro de la ventana.
+        """
+        current = current or self.snapshot()
+        elapsed = current["time"] - prev["time"]
+        energy = current["total_energy"] - prev["total_energy"]
+        operations = current["operations_count"] - prev["operations_count"]
+        counts = {op: n - prev["counts"].get(op, 0) for op, n in current["counts"].items()}
+        energy_by_type = {op: e - prev["energy_by_type"].get(op, 0.0)
+                          for op, e in current["energy_by_type"].items()}
+        return {
+            "elapsed_s": elapsed,
+            "energy_pj": energy,
+            "operations_count": operations,
+            "energy_pj_per_s": energy / elapsed if elapsed > 0 else None,
+            "operations_per_s": operations / elapsed if elapsed > 0 else None,
+            "counts": {op: n for op, n in counts.items() if n},
+            "energy_by_type": {op: e for op, e in energy_by_type.items() if counts[op]},
+            "energy_percentiles_pj": current["sketch"].subtract(prev["sketch"]).percentiles(),
+        }
+
+
+@dataclass(frozen=True)
+class BernoulliMiss:
+    """Cada multiplicación falla en caché con probabilidad `rate` (acceso a RAM)"""
+    rate: float = 0.2
+
+    def __post_init__(self):
+        if not 0.0 <= self.rate <= 1.0:
+            raise ValueError(f"rate debe estar en [0, 1]: {self.rate!r}")
+
+    def outcomes(self, energy: EnergyCost) -> List[tuple]:
+        """(operation, probabilidad, costo) de cada resultado con costo extra"""
+        return [("CACHE_MISS", self.rate, energy.CACHE_MISS)]
+
+
+@dataclass(frozen=True)
+class CacheHierarchy:
+    """
+    Jerarquía L1/L2/RAM: cada acceso se resuelve en L1 (sin costo extra) con
+    probabilidad l1_hit, en L2 con probabilidad l2_hit, y en RAM el resto.
+    ram_cost=None usa EnergyCost.CACHE_MISS.
+    """
+    l1_hit: float = 0.8
+    l2_hit: float = 0.15
+    l2_cost: float = 20.0                # 20 pJ
+    ram_cost: float = None
+
+    def __post_init__(self):
+        for name in ("l1_hit", "l2_hit"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} debe estar en [0, 1]: {getattr(self, name)!r}")
+        if self.l1_hit + self.l2_hit > 1.0:
+            raise ValueError(f"l1_hit + l2_hit no puede superar 1: {self.l1_hit} + {self.l2_hit}")
+
+    def outcomes(self, energy: EnergyCost) -> List[tuple]:
+        ram_cost = energy.CACHE_MISS if self.ram_cost is None else self.ram_cost
+        # max(): evita un -1e-17 por redondeo cuando l1_hit + l2_hit == 1
+        return [("L2_HIT", self.l2_hit, self.l2_cost),
+                ("CACHE_MISS", max(0.0, 1.0 - self.l1_hit - self.l2_hit), ram_cost)]
+
+
 class TraditionalComputer:
     """Simula una computadora tradicional realizando multiplicaciones"""
+
+    RNG_BLOCK = 4096    # uniformes sorteados por bloque para multiply()
     
-    def __init__(self):
-        self.energy = EnergyCost()
-        self.total_energy = 0.0
-        self.operations_log = []
+    def __init__(self, energy: EnergyCost = None, accounting: str = "log", trace_size: int = 0,
+                 miss_model=None, rng: np.random.Generator = None, seed: int = None):
+        """
+        miss_model: BernoulliMiss(rate) (por defecto, 20%), CacheHierarchy(...)
+                    o cualquier objeto con outcomes(energy).
+        rng / seed: Generator propio (o semilla para crearlo); los sorteos no
+                    usan el estado global de np.random, así cada computadora
+                    es reproducible e independiente en ejecuciones paralelas.
+        """
+        self.energy = energy or EnergyCost()
+        self.ledger = EnergyLedger(accounting, trace_size)
+        self.miss_model = miss_model or BernoulliMiss()
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        self._uniforms = []
+
+    @property
+    def total_energy(self) -> float:
+        return self.ledger.total_energy
+
+    @property
+    def operations_log(self):
+        return self.ledger.log
+
+    def _uniform(self) -> float:
+        """Un uniforme [0, 1) del rng, sorteado en bloques de RNG_BLOCK"""
+        if not self._uniforms:
+            self._uniforms = self.rng.random(self.RNG_BLOCK).tolist()
+            self._uniforms.reverse()
+        return self._uniforms.pop()
     
     def multiply(self, a: float, b: float) -> float:
         """Realiza multiplicación tradicional registrando costos"""
+        # Constantes y método del ledger ligados localmente (bucle caliente)
+        energy = self.energy
+        add = self.ledger.add
+
         # 1. Fetch instruction (traer instrucción de multiplicación)
-        self._add_energy("FETCH_MULT_INSTR", self.energy.FETCH_INSTRUCTION)
+        add("FETCH_MULT_INSTR", energy.FETCH_INSTRUCTION)
         
         # 2. Read operandos desde memoria/cache
-        self._add_energy("READ_OPERAND_A", self.energy.READ_MEMORY)
-        self._add_energy("READ_OPERAND_B", self.energy.READ_MEMORY)
+        read = energy.READ_MEMORY
+        add("READ_OPERAND_A", read)
+        add("READ_OPERAND_B", read)
         
         # 3. Realizar multiplicación en ALU
-        self._add_energy("INTEGER_MULTIPLY", self.energy.INTEGER_MULT)
+        add("INTEGER_MULTIPLY", energy.INTEGER_MULT)
         
         # 4. Guardar resultado
-        self._add_energy("WRITE_RESULT", self.energy.WRITE_MEMORY)
+        add("WRITE_RESULT", energy.WRITE_MEMORY)
         
-        # 5. Posible cache miss (20% de probabilidad)
-        if np.random.random() < 0.2:
-            self._add_energy("CACHE_MISS", self.energy.CACHE_MISS)
+        # 5. Posible fallo de caché según el modelo (20% por defecto)
+        u = self._uniform()
+        for operation, probability, cost in self.miss_model.outcomes(energy):
+            if u < probability:
+                add(operation, cost)
+                break
+            u -= probability
         
         return a * b
     
     def batch_multiply(self, values: List[float], multiplier: float) -> List[float]:
-        """Multiplica un batch de valores"""
-        results = []
-        for val in values:
-            results.append(self.multiply(val, multiplier))
-        return results
+        """
+        Multiplica un batch de valores.
+        Mismo modelo de costos que multiply(), pero la multiplicación es una
+        sola operación de array, los fallos de caché de todo el batch salen
+        de un único sorteo multinomial (O(1) en n) y la energía se suma por
+        tipo de operación.
+        """
+        values = np.asarray(values)
+        n = values.size
+        if n == 0:
+            return []
+
+        self._charge_fixed(n)
+        for operation, cost, count in self.draw_misses(n):
+            self._add_energy_bulk(operation, cost, count)
+
+        return (values * multiplier).tolist()
+
+    def _charge_fixed(self, n: int):
+        """Costos deterministas de n multiplicaciones"""
+        self._add_energy_bulk("FETCH_MULT_INSTR", self.energy.FETCH_INSTRUCTION, n)
+        self._add_energy_bulk("READ_OPERAND_A", self.energy.READ_MEMORY, n)
+        self._add_energy_bulk("READ_OPERAND_B", self.energy.READ_MEMORY, n)
+        self._add_energy_bulk("INTEGER_MULTIPLY", self.energy.INTEGER_MULT, n)
+        self._add_energy_bulk("WRITE_RESULT", self.energy.WRITE_MEMORY, n)
+
+    def draw_misses(self, n: int) -> List[tuple]:
+        """
+        Sortea los resultados de caché de n multiplicaciones de una vez:
+        [(operation, costo, cantidad), ...] para los resultados con costo.
+        """
+        outcomes = self.miss_model.outcomes(self.energy)
+        probabilities = [p for _, p, _ in outcomes]
+        counts = self.rng.multinomial(n, probabilities + [max(0.0, 1.0 - sum(probabilities))])
+        return [(operation, cost, int(count))
+                for (operation, _, cost), count in zip(outcomes, counts)]
+
+    def expected_energy(self, n: int) -> float:
+        """Energía esperada (pJ) de n multiplicaciones, sin sortear ni registrar nada"""
+        energy = self.energy
+        per_multiply = (energy.FETCH_INSTRUCTION + 2 * energy.READ_MEMORY
+                        + energy.INTEGER_MULT + energy.WRITE_MEMORY)
+        per_multiply += sum(p * cost for _, p, cost in self.miss_model.outcomes(energy))
+        return n * per_multiply
     
     def _add_energy(self, operation: str, cost: float):
-        self.total_energy += cost
-        self.operations_log.append((operation, cost))
+        self.ledger.add(operation, cost)
+
+    def _add_energy_bulk(self, operation: str, cost: float, count: int):
+        """Registra `count` operaciones idénticas de una vez"""
+        self.ledger.add_bulk(operation, cost, count)
     
     def get_stats(self) -> Dict:
         return {
             "total_energy_pj": self.total_energy,
             "total_energy_nj": self.total_energy / 1000,
-            "operations_count": len(self.operations_log),
-            "operations_by_type": self._count_operations()
+            "operations_count": self.ledger.operations_count,
+            "operations_by_type": self._count_operations(),
+            "energy_percentiles_pj": self.ledger.percentiles(),
         }
     
     def _count_operations(self) -> Dict:
-        counts = {}
-        for op, _ in self.operations_log:
-            counts[op] = counts.get(op, 0) + 1
-        return counts
+        return dict(self.ledger.counts)
+
+    def snapshot(self) -> Dict:
+        return self.ledger.snapshot()
+
+    def diff(self, prev: Dict, current: Dict = None) -> Dict:
+        return self.ledger.diff(prev, current)
 
 # ============================================================================
 # 2. MODELO DE ALMACENAMIENTO ONTOLÓGICO (CAJA VOLUMÉTRICA VIRTUAL)
 # ============================================================================
 
+class DenseGridState:
+    """
+    Almacenamiento denso para grid_state: un ndarray contiguo (H, W) por nivel.
+    Se comporta como el dict {(x, y, level): value} original, pero sin crear
+    objetos tupla/float por celda. Crece automáticamente (duplicando) al
+    escribir fuera de los límites actuales. Solo admite coordenadas >= 0.
+    """
+
+    def __init__(self, width: int = 0, height: int = 0, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.shape = (int(height), int(width))   # (filas = y, columnas = x)
+        self._width, self._cells = self.shape[1], self.shape[0] * self.shape[1]
+        self._planes = {}   # level -> ndarray (H, W) con los valores
+        self._masks = {}    # level -> ndarray bool (H, W), celdas ocupadas
+        # level -> (memoryview plana del plano, de la máscara): acceso por
+        # celda en y * W + x sin crear escalares NumPy (float32/float64)
+        self._views = {}
+        self._count = 0
+
+    def _cache_views(self, level: int):
+        if self.dtype.char in "fd":
+            self._views[level] = (memoryview(self._planes[level]).cast("B").cast(self.dtype.char),
+                                  memoryview(self._masks[level]).cast("B"))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_views"]     # Las memoryview no se serializan
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views = {}
+        for level in self._planes:
+            self._cache_views(level)
+
+    # ---------- gestión de memoria ----------
+
+    def _reserve(self, max_x: int, max_y: int):
+        """Garantiza que (max_x, max_y) quepa en todos los planos"""
+        height, width = self.shape
+        if max_x < width and max_y < height:
+            return
+        new_height = max(height, max_y + 1, 2 * height if max_y >= height else 0)
+        new_width = max(width, max_x + 1, 2 * width if max_x >= width else 0)
+        for level, plane in self._planes.items():
+            grown = np.zeros((new_height, new_width), dtype=self.dtype)
+            grown[:height, :width] = plane
+            self._planes[level] = grown
+            grown_mask = np.zeros((new_height, new_width), dtype=bool)
+            grown_mask[:height, :width] = self._masks[level]
+            self._masks[level] = grown_mask
+            self._cache_views(level)
+        self.shape = (new_height, new_width)
+        self._width, self._cells = new_width, new_height * new_width
+
+    def _level(self, level: int):
+        """Devuelve (plano, máscara) del nivel, creándolos si no existen"""
+        if level not in self._planes:
+            self._planes[level] = np.zeros(self.shape, dtype=self.dtype)
+            self._masks[level] = np.zeros(self.shape, dtype=bool)
+            self._cache_views(level)
+        return self._planes[level], self._masks[level]
+
+    def _in_bounds(self, x: int, y: int, level: int) -> bool:
+        height, width = self.shape
+        return level in self._planes and 0 <= x < width and 0 <= y < height
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por planos y máscaras (bytes)"""
+        return sum(p.nbytes for p in self._planes.values()) + \
+            sum(m.nbytes for m in self._masks.values())
+
+    # ---------- interfaz tipo dict ----------
+
+    def __setitem__(self, key: tuple, value: float):
+        x, y, level = key
+        views = self._views.get(level)
+        if views is not None:
+            # Camino rápido: celda dentro de los límites de un nivel existente
+            width = self._width
+            if 0 <= x < width and 0 <= y:
+                plane, mask = views
+                i = y * width + x
+                if i < self._cells:
+                    try:
+                        plane[i] = value
+                    except TypeError:  # Valores que solo NumPy sabe convertir
+                        self._planes[level][y, x] = value
+                    if not mask[i]:
+                        mask[i] = 1
+                        if self._count is not None:
+                            self._count += 1
+                    return
+        if x < 0 or y < 0:
+            raise IndexError(f"DenseGridState solo admite coordenadas >= 0: {key}")
+        self._reserve(x, y)
+        plane, mask = self._level(level)
+        plane[y, x] = value
+        if not mask[y, x]:
+            mask[y, x] = True
+            if self._count is not None:
+                self._count += 1
+
+    def __getitem__(self, key: tuple) -> float:
+        x, y, level = key
+        views = self._views.get(level)
+        if views is not None:
+            width = self._width
+            if 0 <= x < width and 0 <= y:
+                i = y * width + x
+                if i < self._cells and views[1][i]:
+                    return views[0][i]
+            raise KeyError(key)
+        if not (self._in_bounds(x, y, level) and self._masks[level][y, x]):
+            raise KeyError(key)
+        return self._planes[level][y, x].item()
+
+    def __delitem__(self, key: tuple):
+        x, y, level = key
+        if not (self._in_bounds(x, y, level) and self._masks[level][y, x]):
+            raise KeyError(key)
+        self._masks[level][y, x] = False
+        self._planes[level][y, x] = 0
+        if self._count is not None:
+            self._count -= 1
+
+    def __contains__(self, key) -> bool:
+        x, y, level = key
+        return self._in_bounds(x, y, level) and bool(self._masks[level][y, x])
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = sum(int(np.count_nonzero(m)) for m in self._masks.values())
+        return self._count
+
+    def __iter__(self):
+        for level, mask in self._masks.items():
+            ys, xs = np.nonzero(mask)
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                yield (x, y, level)
+
+    def get(self, key: tuple, default=None):
+        x, y, level = key
+        views = self._views.get(level)
+        if views is not None:
+            width = self._width
+            if 0 <= x < width and 0 <= y:
+                i = y * width + x
+                if i < self._cells and views[1][i]:
+                    return views[0][i]
+            return default
+        if self._in_bounds(x, y, level) and self._masks[level][y, x]:
+            return self._planes[level][y, x].item()
+        return default
+
+    def pop(self, key: tuple, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def keys(self):
+        return list(iter(self))
+
+    def values(self):
+        return [self._planes[level][y, x].item() for x, y, level in self]
+
+    def items(self):
+        return [((x, y, level), self._planes[level][y, x].item()) for x, y, level in self]
+
+    def clear(self):
+        self._planes.clear()
+        self._masks.clear()
+        self._views.clear()
+        self._count = 0
+
+    # ---------- acceso vectorizado ----------
+
+    def get_many(self, xs, ys, level: int, default: float = 0.0) -> np.ndarray:
+        """Lee varias celdas de un nivel; las vacías devuelven `default`"""
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        out = np.full(xs.shape, default, dtype=self.dtype)
+        if level not in self._planes:
+            return out
+        height, width = self.shape
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        xi, yi = xs[inside], ys[inside]
+        occupied = self._masks[level][yi, xi]
+        values = np.where(occupied, self._planes[level][yi, xi], default)
+        out[inside] = values
+        return out
+
+    def set_many(self, xs, ys, level: int, values):
+        """Escribe varias celdas de un nivel en una sola operación"""
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        if xs.size == 0:
+            return
+        if xs.min() < 0 or ys.min() < 0:
+            raise IndexError("DenseGridState solo admite coordenadas >= 0")
+        self._reserve(int(xs.max()), int(ys.max()))
+        plane, mask = self._level(level)
+        plane[ys, xs] = values
+        if not mask[ys, xs].all():
+            mask[ys, xs] = True
+            # Con posiciones repetidas en el lote es más barato recontar
+            # la máscara completa cuando se pida len()
+            self._count = None
+
+    def delete_many(self, xs, ys, level: int):
+        """Libera varias celdas de un nivel (las vacías se ignoran)"""
+        if level not in self._planes:
+            return
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        height, width = self.shape
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        xi, yi = xs[inside], ys[inside]
+        self._masks[level][yi, xi] = False
+        self._planes[level][yi, xi] = 0
+        self._count = None
+
+    def plane(self, level: int) -> np.ndarray:
+        """
+        Vista (H, W) del nivel hasta la última fila/columna ocupada (ceros
+        donde no hay valor)
+        """
+        if level not in self._planes:
+            return np.zeros((0, 0), dtype=self.dtype)
+        mask = self._masks[level]
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if rows.size == 0:
+            return np.zeros((0, 0), dtype=self.dtype)
+        return self._planes[level][:rows[-1] + 1, :cols[-1] + 1]
+
+
+class ChunkedGridState:
+    """
+    Almacenamiento disperso por bloques: cada nivel se divide en tiles de
+    tile_size x tile_size que solo existen si alguna celda fue escrita.
+    Admite coordenadas negativas. Con save()/open() los tiles se guardan
+    en disco y se abren con np.memmap: solo los tiles tocados se cargan
+    (paginan) en memoria, así un grid mayor que la RAM se reanuda sin
+    reconstruirlo celda por celda.
+
+    Formato en disco (un directorio):
+        meta.json   -> tile_size, dtype, lista de tiles y metadatos libres
+        values.dat  -> float (n_tiles, tile_size, tile_size)
+        masks.dat   -> bool  (n_tiles, tile_size, tile_size)
+    """
+
+    META_FILE = "meta.json"
+    VALUES_FILE = "values.dat"
+    MASKS_FILE = "masks.dat"
+
+    def __init__(self, tile_size: int = 256, dtype=np.float64):
+        if tile_size <= 0:
+            raise ValueError("tile_size debe ser positivo")
+        self.tile_size = int(tile_size)
+        self.dtype = np.dtype(dtype)
+        self._tiles = {}     # (level, tx, ty) -> (values, mask) ya cargados
+        self._on_disk = {}   # (level, tx, ty) -> slot en el memmap, aún sin tocar
+        self._values_mm = None
+        self._masks_mm = None
+        self._count = 0
+
+    # ---------- tiles ----------
+
+    def _tile(self, key: tuple, create: bool = False):
+        """(values, mask) del tile `key`; carga perezosa desde el memmap"""
+        tile = self._tiles.get(key)
+        if tile is not None:
+            return tile
+        slot = self._on_disk.pop(key, None)
+        if slot is not None:
+            tile = (self._values_mm[slot], self._masks_mm[slot])
+        elif create:
+            shape = (self.tile_size, self.tile_size)
+            tile = (np.zeros(shape, dtype=self.dtype), np.zeros(shape, dtype=bool))
+        else:
+            return None
+        self._tiles[key] = tile
+        return tile
+
+    def _tile_keys(self):
+        return list(self._tiles) + list(self._on_disk)
+
+    @property
+    def tile_count(self) -> int:
+        return len(self._tiles) + len(self._on_disk)
+
+    @property
+    def loaded_tile_count(self) -> int:
+        """Tiles efectivamente cargados en memoria (o paginados desde disco)"""
+        return len(self._tiles)
+
+    def _locate(self, key: tuple):
+        x, y, level = key
+        tx, lx = divmod(x, self.tile_size)
+        ty, ly = divmod(y, self.tile_size)
+        return (level, tx, ty), lx, ly
+
+    # ---------- interfaz tipo dict ----------
+
+    def __setitem__(self, key: tuple, value: float):
+        tile_key, lx, ly = self._locate(key)
+        values, mask = self._tile(tile_key, create=True)
+        values[ly, lx] = value
+        if not mask[ly, lx]:
+            mask[ly, lx] = True
+            self._count += 1
+
+    def __getitem__(self, key: tuple) -> float:
+        tile_key, lx, ly = self._locate(key)
+        tile = self._tile(tile_key)
+        if tile is None or not tile[1][ly, lx]:
+            raise KeyError(key)
+        return tile[0][ly, lx].item()
+
+    def __delitem__(self, key: tuple):
+        tile_key, lx, ly = self._locate(key)
+        tile = self._tile(tile_key)
+        if tile is None or not tile[1][ly, lx]:
+            raise KeyError(key)
+        tile[1][ly, lx] = False
+        tile[0][ly, lx] = 0
+        self._count -= 1
+
+    def __contains__(self, key) -> bool:
+        tile_key, lx, ly = self._locate(key)
+        tile = self._tile(tile_key)
+        return tile is not None and bool(tile[1][ly, lx])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for level, tx, ty in self._tile_keys():
+            _, mask = self._tile((level, tx, ty))
+            ys, xs = np.nonzero(mask)
+            for lx, ly in zip(xs.tolist(), ys.tolist()):
+                yield (tx * self.tile_size + lx, ty * self.tile_size + ly, level)
+
+    def get(self, key: tuple, default=None):
+        tile_key, lx, ly = self._locate(key)
+        tile = self._tile(tile_key)
+        if tile is None or not tile[1][ly, lx]:
+            return default
+        return tile[0][ly, lx].item()
+
+    def pop(self, key: tuple, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def keys(self):
+        return list(iter(self))
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def clear(self):
+        self._tiles.clear()
+        self._on_disk.clear()
+        self._count = 0
+
+    # ---------- acceso vectorizado ----------
+
+    def _group_by_tile(self, xs, ys):
+        """Agrupa coordenadas por tile: [(tx, ty, índices, lx, ly), ...]"""
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        txs, lxs = np.divmod(xs, self.tile_size)
+        tys, lys = np.divmod(ys, self.tile_size)
+        pairs, inverse = np.unique(np.column_stack((txs, tys)), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(pairs) + 1))
+        for i, (tx, ty) in enumerate(pairs.tolist()):
+            idx = order[bounds[i]:bounds[i + 1]]
+            yield tx, ty, idx, lxs[idx], lys[idx]
+
+    def get_many(self, xs, ys, level: int, default: float = 0.0) -> np.ndarray:
+        """Lee varias celdas de un nivel; las vacías devuelven `default`"""
+        out = np.full(np.shape(xs), default, dtype=self.dtype)
+        if out.size == 0:
+            return out
+        for tx, ty, idx, lx, ly in self._group_by_tile(xs, ys):
+            tile = self._tile((level, tx, ty))
+            if tile is None:
+                continue
+            values, mask = tile
+            out[idx] = np.where(mask[ly, lx], values[ly, lx], default)
+        return out
+
+    def set_many(self, xs, ys, level: int, values):
+        """Escribe varias celdas de un nivel, un bloque de numpy por tile"""
+        values = np.broadcast_to(np.asarray(values, dtype=self.dtype), np.shape(xs))
+        if values.size == 0:
+            return
+        for tx, ty, idx, lx, ly in self._group_by_tile(xs, ys):
+            tile_values, mask = self._tile((level, tx, ty), create=True)
+            tile_values[ly, lx] = values[idx]
+            if not mask[ly, lx].all():
+                # Recontar el tile (acotado) evita deduplicar posiciones repetidas
+                before = int(np.count_nonzero(mask))
+                mask[ly, lx] = True
+                self._count += int(np.count_nonzero(mask)) - before
+
+    def delete_many(self, xs, ys, level: int):
+        """Libera varias celdas de un nivel (las vacías se ignoran)"""
+        if np.size(xs) == 0:
+            return
+        for tx, ty, idx, lx, ly in self._group_by_tile(xs, ys):
+            tile = self._tile((level, tx, ty))
+            if tile is None:
+                continue
+            values, mask = tile
+            before = int(np.count_nonzero(mask))
+            mask[ly, lx] = False
+            values[ly, lx] = 0
+            self._count -= before - int(np.count_nonzero(mask))
+
+    def plane(self, level: int) -> np.ndarray:
+        """
+        Copia densa del nivel para la región x, y >= 0, hasta la última
+        fila/columna ocupada (ceros donde no hay valor)
+        """
+        keys = [(tx, ty) for lv, tx, ty in self._tile_keys() if lv == level and tx >= 0 and ty >= 0]
+        if not keys:
+            return np.zeros((0, 0), dtype=self.dtype)
+        size = self.tile_size
+        width = height = 0
+        tiles = []
+        for tx, ty in keys:
+            values, mask = self._tile((level, tx, ty))
+            rows = np.flatnonzero(mask.any(axis=1))
+            if rows.size == 0:
+                continue
+            cols = np.flatnonzero(mask.any(axis=0))
+            height = max(height, ty * size + rows[-1] + 1)
+            width = max(width, tx * size + cols[-1] + 1)
+            tiles.append((tx, ty, values))
+        out = np.zeros((height, width), dtype=self.dtype)
+        for tx, ty, values in tiles:
+            block = out[ty * size:(ty + 1) * size, tx * size:(tx + 1) * size]
+            block[...] = values[:block.shape[0], :block.shape[1]]
+        return out
+
+    # ---------- persistencia ----------
+
+    def save(self, path: str, metadata: Dict = None):
+        """
+        Guarda todos los tiles en `path` (directorio). Los tiles se copian
+        de uno en uno, así guardar no requiere tener el grid entero en RAM.
+        `metadata` se guarda tal cual en meta.json (debe ser serializable).
+        """
+        os.makedirs(path, exist_ok=True)
+        keys = self._tile_keys()
+        shape = (max(1, len(keys)), self.tile_size, self.tile_size)
+        # Se escribe en archivos temporales: `path` puede ser el mismo
+        # directorio del que provienen los memmaps actuales
+        values_tmp = os.path.join(path, self.VALUES_FILE + ".tmp")
+        masks_tmp = os.path.join(path, self.MASKS_FILE + ".tmp")
+        values_mm = np.memmap(values_tmp, dtype=self.dtype, mode="w+", shape=shape)
+        masks_mm = np.memmap(masks_tmp, dtype=bool, mode="w+", shape=shape)
+        for slot, key in enumerate(keys):
+            tile = self._tiles.get(key)
+            if tile is None:
+                disk_slot = self._on_disk[key]
+                tile = (self._values_mm[disk_slot], self._masks_mm[disk_slot])
+            values_mm[slot] = tile[0]
+            masks_mm[slot] = tile[1]
+        values_mm.flush()
+        masks_mm.flush()
+        del values_mm, masks_mm
+        os.replace(values_tmp, os.path.join(path, self.VALUES_FILE))
+        os.replace(masks_tmp, os.path.join(path, self.MASKS_FILE))
+
+        meta = {
+            "tile_size": self.tile_size,
+            "dtype": self.dtype.str,
+            "count": self._count,
+            "tiles": [list(key) for key in keys],
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(path, self.META_FILE), "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def open(cls, path: str, mode: str = "c"):
+        """
+        Abre un grid guardado sin leer los tiles: se mapean con np.memmap y
+        se paginan al tocarlos. Con mode="c" (copy-on-write, por defecto) los
+        cambios quedan en memoria y solo save() los persiste. mode="r+"
+        escribe los cambios directamente en los tiles, pero meta.json (count,
+        lista de tiles) no se actualiza hasta save(): sin él la copia en disco
+        queda inconsistente.
+        Devuelve (grid, metadata).
+        """
+        with open(os.path.join(path, cls.META_FILE)) as f:
+            meta = json.load(f)
+        grid = cls(tile_size=meta["tile_size"], dtype=np.dtype(meta["dtype"]))
+        shape = (max(1, len(meta["tiles"])), grid.tile_size, grid.tile_size)
+        grid._values_mm = np.memmap(os.path.join(path, cls.VALUES_FILE),
+                                    dtype=grid.dtype, mode=mode, shape=shape)
+        grid._masks_mm = np.memmap(os.path.join(path, cls.MASKS_FILE),
+                                   dtype=bool, mode=mode, shape=shape)
+        grid._on_disk = {tuple(key): slot for slot, key in enumerate(meta["tiles"])}
+        grid._count = meta["count"]
+        return grid, meta["metadata"]
+
+    @classmethod
+    def from_grid_state(cls, grid_state, tile_size: int = 256):
+        """Convierte un grid_state dict o DenseGridState a bloques"""
+        chunked = cls(tile_size=tile_size)
+        if isinstance(grid_state, DenseGridState):
+            for level, mask in grid_state._masks.items():
+                ys, xs = np.nonzero(mask)
+                chunked.set_many(xs, ys, level, grid_state._planes[level][ys, xs])
+        else:
+            for key, value in grid_state.items():
+                chunked[key] = value
+        return chunked
+
+
+class LevelTable(dict):
+    """
+    dict {level: factor} que cuenta sus modificaciones, para que la tabla
+    de factores de transición precalculada se invalide cuando cambia.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def _touch(self):
+        self.version += 1
+
+    def __setitem__(self, level, factor):
+        super().__setitem__(level, factor)
+        self._touch()
+
+    def __delitem__(self, level):
+        super().__delitem__(level)
+        self._touch()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._touch()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._touch()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._touch()
+        return item
+
+    def setdefault(self, level, factor=None):
+        value = super().setdefault(level, factor)
+        self._touch()
+        return value
+
+    def clear(self):
+        super().clear()
+        self._touch()
+
+
 class VolumetricBox:
     """
     Modelo virtual de la caja volumétrica
     Cada nivel tiene un factor pre-encodado físicamente
     """
-    
-    def __init__(self, levels: Dict[int, float] = None):
+
+    def __init__(self, levels: Dict[int, float] = None, storage: str = "dict",
+                 accounting: str = "log", trace_size: int = 0, tile_size: int = 256,
+                 backend=None):
         # Niveles pre-definidos (como en la caja física)
         self.levels = levels or {
             1: 1.0,     # L1: ×1
@@ -105,13 +1169,72 @@ class VolumetricBox:
         self.energy_cost_per_shift = 0.5  # 0.5 pJ (1000x menos que multiplicación)
         self.energy_cost_per_read = 0.1   # 0.1 pJ (sensor óptico simple)
         
-        self.total_energy = 0.0
-        self.operations_log = []
+        self.ledger = EnergyLedger(accounting, trace_size)
+
+        # Núcleo "valor × factor" (spatial_backends; None = elección en tiempo de ejecución)
+        self.backend = _spatial_backend(backend)
         
         # Estado actual: valores en posiciones
         # {(x, y, level): value}
-        self.grid_state = {}
+        # storage="dense" usa un ndarray por nivel con la misma interfaz,
+        # storage="chunked" usa tiles dispersos que se pueden guardar en disco
+        if storage == "dict":
+            self.grid_state = {}
+        elif storage == "dense":
+            self.grid_state = DenseGridState()
+        elif storage == "chunked":
+            self.grid_state = ChunkedGridState(tile_size=tile_size)
+        else:
+            raise ValueError(f"storage desconocido: {storage!r} "
+                             "(use 'dict', 'dense' o 'chunked')")
     
+    @property
+    def total_energy(self) -> float:
+        return self.ledger.total_energy
+
+    @property
+    def operations_log(self):
+        return self.ledger.log
+
+    @property
+    def levels(self) -> LevelTable:
+        return self._levels
+
+    @levels.setter
+    def levels(self, levels: Dict[int, float]):
+        self._levels = LevelTable(levels)
+        self._transitions_version = None
+        self._pairs_version = None
+
+    def _transition_table(self):
+        """
+        Matriz N×N de factores T[i, j] = factor(j) / factor(i), más el índice
+        level -> fila. Se reconstruye solo cuando `levels` cambia.
+        """
+        if self._transitions_version != self._levels.version:
+            order = list(self._levels)
+            factors = np.array([self._levels[level] for level in order], dtype=float)
+            self._transition_index = {level: i for i, level in enumerate(order)}
+            self._transitions = factors[np.newaxis, :] / factors[:, np.newaxis]
+            self._transitions_version = self._levels.version
+        return self._transitions, self._transition_index
+
+    def transition_factor(self, from_level: int, to_level: int) -> float:
+        """
+        Factor factor(to) / factor(from). Camino escalar: un dict de floats
+        por par (from, to), vaciado cuando `levels` cambia; la matriz
+        ndarray queda para shift_path.
+        """
+        if self._pairs_version != self._levels.version:
+            self._pair_factors = {}
+            self._pairs_version = self._levels.version
+        key = (from_level, to_level)
+        factor = self._pair_factors.get(key)
+        if factor is None:
+            factor = float(self._levels[to_level]) / float(self._levels[from_level])
+            self._pair_factors[key] = factor
+        return factor
+
     def place_value(self, value: float, x: int, y: int, level: int = 1):
         """Colocar valor en posición específica"""
         self.grid_state[(x, y, level)] = value
@@ -131,42 +1254,390 @@ class VolumetricBox:
         
         # El valor transformado YA EXISTE en la estructura del nivel
         original_value = self.grid_state.get((x, y, from_level), 0)
-        transformation_factor = self.levels[to_level] / self.levels[from_level]
+        transformation_factor = self.transition_factor(from_level, to_level)
         
         # NOTA: Esta multiplicación es solo para simulación
         # En hardware real, el valor transformado se leería directamente
-        transformed_value = original_value * transformation_factor
+        transformed_value = self.backend.scale(original_value, transformation_factor)
         
         # Actualizar estado (en hardware real sería solo cambiar puntero)
         self.grid_state[(x, y, to_level)] = transformed_value
         
         return transformed_value
     
+    def batch_place(self, values, positions, level: int = 1):
+        """Colocar muchos valores a la vez; positions es [(x, y), ...] o array (n, 2)"""
+        xs, ys = self._split_positions(positions)
+        self._write_cells(xs, ys, level, np.asarray(values, dtype=float))
+
     def batch_shift(self, positions: List[tuple], from_level: int, to_level: int) -> List[float]:
-        """Cambiar nivel para múltiples posiciones a la vez"""
-        results = []
-        for x, y in positions:
-            results.append(self.shift_level(x, y, from_level, to_level))
-        return results
+        """
+        Cambiar nivel para múltiples posiciones a la vez.
+        La transformación es una sola operación de array y la energía se
+        registra en bloque (un PHYSICAL_SHIFT + un READ por posición).
+        """
+        xs, ys = self._split_positions(positions)
+        n = xs.size
+        if n == 0:
+            return []
+
+        self._add_energy_bulk("PHYSICAL_SHIFT", self.energy_cost_per_shift, n)
+        self._add_energy_bulk("READ_TRANSFORMED_VALUE", self.energy_cost_per_read, n)
+
+        transformation_factor = self.transition_factor(from_level, to_level)
+        transformed = np.asarray(self.backend.scale_many(self._read_cells(xs, ys, from_level),
+                                                         transformation_factor), dtype=float)
+        self._write_cells(xs, ys, to_level, transformed)
+
+        return transformed.tolist()
+
+    def shift_path(self, positions: List[tuple], path: List[int]) -> List[float]:
+        """
+        Ruta multinivel (ej: [1, 2, 3]) en una sola pasada: se aplica el
+        factor compuesto de todos los saltos y solo se escribe el nivel final.
+        La energía se cobra por salto (PHYSICAL_SHIFT + READ por posición),
+        igual que si se hicieran los batch_shift intermedios.
+        """
+        if len(path) < 2:
+            raise ValueError("path necesita al menos dos niveles")
+        xs, ys = self._split_positions(positions)
+        n = xs.size
+        if n == 0:
+            return []
+
+        table, index = self._transition_table()
+        hops = [index[level] for level in path]
+        composed = float(np.prod(table[hops[:-1], hops[1:]]))
+
+        hop_count = len(path) - 1
+        self._add_energy_bulk("PHYSICAL_SHIFT", self.energy_cost_per_shift, n * hop_count)
+        self._add_energy_bulk("READ_TRANSFORMED_VALUE", self.energy_cost_per_read, n * hop_count)
+
+        transformed = self._read_cells(xs, ys, path[0]) * composed
+        self._write_cells(xs, ys, path[-1], transformed)
+
+        return transformed.tolist()
+
+    def get_plane(self, level: int) -> np.ndarray:
+        """
+        Nivel completo como array (H, W) indexado [y, x], región x, y >= 0
+        hasta la última fila/columna ocupada, ceros en celdas vacías.
+        Con storage="dense" es una vista: no modificar.
+        """
+        if isinstance(self.grid_state, (DenseGridState, ChunkedGridState)):
+            return self.grid_state.plane(level)
+        cells = [(x, y, value) for (x, y, lv), value in self.grid_state.items()
+                 if lv == level and x >= 0 and y >= 0]
+        if not cells:
+            return np.zeros((0, 0))
+        xs, ys, values = (np.array(column) for column in zip(*cells))
+        plane = np.zeros((ys.max() + 1, xs.max() + 1))
+        plane[ys, xs] = values
+        return plane
+
+    def set_plane(self, level: int, plane: np.ndarray, origin: tuple = (0, 0)):
+        """Escribe un array (H, W) como nivel completo a partir de origin=(x, y)"""
+        plane = np.asarray(plane, dtype=float)
+        ys, xs = np.indices(plane.shape)
+        self._write_cells(xs.ravel() + origin[0], ys.ravel() + origin[1], level, plane.ravel())
+
+    def stream_shift(self, stream, from_level: int, to_level: int, chunk_size: int = 4096):
+        """
+        Generador para flujos sin fin: `stream` entrega valores sueltos o
+        bloques (listas/arrays) y cada bloque de hasta `chunk_size` valores
+        se entrega desplazado como ndarray. Se cobra lo mismo que batch_shift
+        (un PHYSICAL_SHIFT + un READ por valor), pero los valores del flujo
+        no pasan por grid_state: las celdas de la caja no se tocan.
+        Con accounting="counters" la memoria queda constante; en modo "log"
+        el ledger guarda dos entradas por valor.
+        """
+        def chunks():
+            buffer = []
+            for item in stream:
+                if np.ndim(item) == 0:
+                    buffer.append(item)
+                    if len(buffer) >= chunk_size:
+                        yield np.asarray(buffer, dtype=float)
+                        buffer = []
+                else:
+                    if buffer:
+                        yield np.asarray(buffer, dtype=float)
+                        buffer = []
+                    block = np.asarray(item, dtype=float).ravel()
+                    # Bloques mayores que chunk_size se parten
+                    for start in range(0, block.size, chunk_size):
+                        yield block[start:start + chunk_size]
+            if buffer:
+                yield np.asarray(buffer, dtype=float)
+
+        for chunk in chunks():
+            n = chunk.size
+            self._add_energy_bulk("PHYSICAL_SHIFT", self.energy_cost_per_shift, n)
+            self._add_energy_bulk("READ_TRANSFORMED_VALUE", self.energy_cost_per_read, n)
+            factor = self.transition_factor(from_level, to_level)
+            yield np.asarray(self.backend.scale_many(chunk, factor), dtype=float)
+
+    @staticmethod
+    def _split_positions(positions):
+        """[(x, y), ...] o array (n, 2) -> (xs, ys) como arrays de enteros"""
+        coords = np.asarray(positions, dtype=np.intp).reshape(-1, 2)
+        return coords[:, 0], coords[:, 1]
+
+    def _read_cells(self, xs: np.ndarray, ys: np.ndarray, level: int) -> np.ndarray:
+        if isinstance(self.grid_state, (DenseGridState, ChunkedGridState)):
+            return self.grid_state.get_many(xs, ys, level)
+        get = self.grid_state.get
+        return np.array([get((x, y, level), 0) for x, y in zip(xs.tolist(), ys.tolist())],
+                        dtype=float)
+
+    def _write_cells(self, xs: np.ndarray, ys: np.ndarray, level: int, values: np.ndarray):
+        if isinstance(self.grid_state, (DenseGridState, ChunkedGridState)):
+            self.grid_state.set_many(xs, ys, level, values)
+            return
+        self.grid_state.update(zip(zip(xs.tolist(), ys.tolist(), repeat(level)),
+                                   values.tolist()))
     
+    def _delete_cells(self, xs: np.ndarray, ys: np.ndarray, level: int):
+        if isinstance(self.grid_state, (DenseGridState, ChunkedGridState)):
+            self.grid_state.delete_many(xs, ys, level)
+            return
+        pop = self.grid_state.pop
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            pop((x, y, level), None)
+
     def _add_energy(self, operation: str, cost: float):
-        self.total_energy += cost
-        self.operations_log.append((operation, cost))
+        self.ledger.add(operation, cost)
+
+    def _add_energy_bulk(self, operation: str, cost: float, count: int):
+        """Registra `count` operaciones idénticas de una vez"""
+        self.ledger.add_bulk(operation, cost, count)
+
+    def save(self, path: str):
+        """
+        Guarda grid, niveles, costos y totales de energía en `path` para
+        reanudar la simulación con VolumetricBox.open(). Si el grid no es
+        'chunked' se convierte a bloques al guardar.
+        """
+        grid = self.grid_state
+        if not isinstance(grid, ChunkedGridState):
+            grid = ChunkedGridState.from_grid_state(grid)
+        grid.save(path, metadata={
+            "levels": [[level, factor] for level, factor in self.levels.items()],
+            "energy_cost_per_shift": self.energy_cost_per_shift,
+            "energy_cost_per_read": self.energy_cost_per_read,
+            "ledger": self.ledger.summary(),
+        })
+
+    @classmethod
+    def open(cls, path: str, mode: str = "c", accounting: str = "log",
+             trace_size: int = 0, backend=None) -> "VolumetricBox":
+        """
+        Reanuda una caja guardada con save(). Los tiles se abren con
+        np.memmap y solo se cargan al tocarlos. Los totales de energía se
+        restauran; el operations_log detallado no se guarda.
+        """
+        grid, meta = ChunkedGridState.open(path, mode=mode)
+        box = cls(levels={level: factor for level, factor in meta["levels"]},
+                  accounting=accounting, trace_size=trace_size, backend=backend)
+        box.grid_state = grid
+        box.energy_cost_per_shift = meta["energy_cost_per_shift"]
+        box.energy_cost_per_read = meta["energy_cost_per_read"]
+        box.ledger.restore(meta["ledger"])
+        return box
     
     def get_stats(self) -> Dict:
         return {
             "total_energy_pj": self.total_energy,
             "total_energy_nj": self.total_energy / 1000,
-            "operations_count": len(self.operations_log),
-            "energy_per_operation_pj": self.total_energy / max(1, len(self.operations_log))
+            "operations_count": self.ledger.operations_count,
+            "energy_per_operation_pj": self.total_energy / max(1, self.ledger.operations_count),
+            "energy_percentiles_pj": self.ledger.percentiles(),
         }
 
+    def snapshot(self) -> Dict:
+        return self.ledger.snapshot()
+
+    def diff(self, prev: Dict, current: Dict = None) -> Dict:
+        return self.ledger.diff(prev, current)
+
 # ============================================================================
-# 3. DEMOSTRACIÓN VISUAL COMPARATIVA
+# 3. BARRIDO DE ESCALABILIDAD EN PARALELO (MULTI-NÚCLEO)
 # ============================================================================
 
-def run_comparison_demo():
-    """Ejecuta demostración comparativa completa"""
+def _sweep_job_seed(base_seed: int, size: int, repeat_index: int, params_index: int) -> int:
+    """
+    Semilla determinista derivada de la identidad del trabajo (no del orden
+    de ejecución). params_index=-1 identifica los trabajos de la caja.
+    """
+    sequence = np.random.SeedSequence([base_seed, size, repeat_index, params_index + 1])
+    return int(sequence.generate_state(1)[0])
+
+
+def _sweep_job(job: Dict) -> Dict:
+    """
+    Ejecuta un trabajo (size, model, seed) del barrido. Se procesa en bloques
+    de `chunk_size` con contabilidad por contadores, así la memoria no crece
+    con `size` (permite tamaños de 10^8).
+    """
+    size, model, chunk_size = job["size"], job["model"], job["chunk_size"]
+
+    if model == "traditional":
+        computer = TraditionalComputer(energy=EnergyCost(**job["energy"]),
+                                       accounting="counters", seed=job["seed"])
+        for start in range(0, size, chunk_size):
+            stop = min(size, start + chunk_size)
+            computer.batch_multiply(np.arange(start + 1, stop + 1), 40)
+        energy = computer.total_energy
+    else:
+        box = VolumetricBox(storage="dense", accounting="counters")
+        for start in range(0, size, chunk_size):
+            stop = min(size, start + chunk_size)
+            local = np.arange(stop - start)
+            positions = np.column_stack((local % 100, local // 100))
+            box.batch_place(np.arange(start + 1, stop + 1), positions, level=1)
+            box.batch_shift(positions, 1, 2)
+            # La colocación no cuesta energía: se libera el bloque procesado
+            box.grid_state.clear()
+        energy = box.total_energy
+
+    return dict(job, total_energy=energy)
+
+
+def run_scalability_sweep(sizes: List[int], energy_costs: List[EnergyCost] = None,
+                          repeats: int = 1, base_seed: int = 0,
+                          max_workers: int = None, chunk_size: int = 1_000_000) -> Dict:
+    """
+    Barrido de escalabilidad: reparte los trabajos (size, model, seed) en un
+    ProcessPoolExecutor. Cada trabajo recibe una semilla derivada de
+    (base_seed, size, repetición, parámetros), así el resultado no depende
+    del número de procesos ni del orden en que terminan.
+
+    Devuelve las mismas listas que el escenario 3 (`trad_energies` y
+    `box_energies`, promedio de las repeticiones, con energy_costs[0]) más
+    `trad_energies_by_params` (una lista por conjunto de EnergyCost) y
+    `runs` con cada trabajo individual. max_workers=1 ejecuta en el proceso
+    actual.
+    """
+    energy_costs = energy_costs or [EnergyCost()]
+    jobs = []
+    for size in sizes:
+        for rep in range(repeats):
+            for p, energy in enumerate(energy_costs):
+                jobs.append({"size": size, "model": "traditional", "repeat": rep,
+                             "params_index": p, "energy": asdict(energy),
+                             "seed": _sweep_job_seed(base_seed, size, rep, p),
+                             "chunk_size": chunk_size})
+            # La caja no depende de EnergyCost: un trabajo por repetición
+            jobs.append({"size": size, "model": "box", "repeat": rep,
+                         "params_index": None, "energy": None,
+                         "seed": _sweep_job_seed(base_seed, size, rep, -1),
+                         "chunk_size": chunk_size})
+
+    if max_workers == 1:
+        runs = [_sweep_job(job) for job in jobs]
+    else:
+        # Los trabajos grandes primero para repartir mejor la carga
+        order = sorted(range(len(jobs)), key=lambda i: -jobs[i]["size"])
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            done = pool.map(_sweep_job, [jobs[i] for i in order])
+            runs = [None] * len(jobs)
+            for i, result in zip(order, done):
+                runs[i] = result
+
+    trad_by_params = [[0.0] * len(sizes) for _ in energy_costs]
+    box_energies = [0.0] * len(sizes)
+    position = {size: i for i, size in enumerate(sizes)}
+    for run in runs:
+        i = position[run["size"]]
+        if run["model"] == "traditional":
+            trad_by_params[run["params_index"]][i] += run["total_energy"] / repeats
+        else:
+            box_energies[i] += run["total_energy"] / repeats
+
+    return {
+        "sizes": list(sizes),
+        "trad_energies": trad_by_params[0],
+        "box_energies": box_energies,
+        "trad_energies_by_params": trad_by_params,
+        "runs": runs,
+    }
+
+# ============================================================================
+# 4. DEMOSTRACIÓN VISUAL COMPARATIVA
+# ============================================================================
+
+REPORT_PATH = 'efficiency_comparison.png'
+
+
+def _draw_report(fig, sizes, trad_energies, box_energies):
+    """Dibuja los dos gráficos comparativos sobre una figura de matplotlib"""
+    axes = fig.subplots(1, 2)
+    
+    # Gráfico 1: Energía por número de operaciones
+    axes[0].plot(sizes, trad_energies, 'r-', linewidth=2, label='Tradicional (Von Neumann)')
+    axes[0].plot(sizes, box_energies, 'b-', linewidth=2, label='Caja Volumétrica')
+    axes[0].set_xscale('log')
+    axes[0].set_yscale('log')
+    axes[0].set_xlabel('Número de Multiplicaciones')
+    axes[0].set_ylabel('Energía (picojoules)')
+    axes[0].set_title('Consumo Energético: Escalabilidad')
+    axes[0].grid(True, alpha=0.3)
+    axes[0].legend()
+    
+    # Gráfico 2: Ratio de eficiencia
+    ratios = [t/b for t, b in zip(trad_energies, box_energies)]
+    axes[1].bar(range(len(sizes)), ratios, color='green', alpha=0.7)
+    axes[1].set_xlabel('Número de Operaciones (escala log)')
+    axes[1].set_ylabel('Ratio de Eficiencia (x veces)')
+    axes[1].set_title('Ventaja de Caja Volumétrica')
+    axes[1].set_xticks(range(len(sizes)))
+    axes[1].set_xticklabels([str(s) for s in sizes])
+    axes[1].grid(True, alpha=0.3, axis='y')
+    
+    # Añadir valores encima de las barras
+    for i, ratio in enumerate(ratios):
+        axes[1].text(i, ratio + 0.1, f'{ratio:.0f}x', ha='center', va='bottom')
+    
+    fig.tight_layout()
+
+
+def render_report(sizes, trad_energies, box_energies, path: str = REPORT_PATH,
+                  show: bool = False):
+    """
+    Genera y guarda el gráfico comparativo. matplotlib se importa aquí y no
+    al cargar el módulo: los modelos de simulación no dependen de él.
+    Sin `show` se usa Figure + Agg directamente (sin pyplot ni ventana),
+    lo que funciona en servidores y fuera del hilo principal.
+    """
+    if show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(12, 5))
+    else:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(12, 5))
+    _draw_report(fig, sizes, trad_energies, box_energies)
+    
+    # Guardar gráfico
+    fig.savefig(path, dpi=150, bbox_inches='tight')
+    return fig
+
+
+def render_report_async(sizes, trad_energies, box_energies,
+                        path: str = REPORT_PATH) -> threading.Thread:
+    """Renderiza el gráfico en un hilo de fondo; join() espera a que termine"""
+    thread = threading.Thread(target=render_report, name="efficiency-report",
+                              args=(sizes, trad_energies, box_energies, path))
+    thread.start()
+    return thread
+
+
+def run_comparison_demo(plot: bool = True, show: bool = True, background: bool = False):
+    """
+    Ejecuta demostración comparativa completa.
+    plot=False omite el gráfico (no se importa matplotlib); background=True
+    lo renderiza en un hilo sin bloquear (y sin ventana); show=False guarda
+    el PNG sin llamar al bloqueante plt.show().
+    """
     
     print("=" * 70)
     print("DEMOSTRACIÓN DE EFICIENCIA: Caja Volumétrica vs Computación Tradicional")
@@ -214,12 +1685,11 @@ def run_comparison_demo():
     box_batch = VolumetricBox()
     
     # Colocar todos los valores
-    for i, val in enumerate(test_values):
-        box_batch.place_value(val, x=i%10, y=i//10, level=1)
+    positions = [(i%10, i//10) for i in range(n_operations)]
+    box_batch.batch_place(test_values, positions, level=1)
     
     # Cambiar nivel para TODOS (batch)
     start_time = time.time()
-    positions = [(i%10, i//10) for i in range(n_operations)]
     box_results = box_batch.batch_shift(positions, from_level=1, to_level=2)
     box_time = time.time() - start_time
     box_batch_stats = box_batch.get_stats()
@@ -242,22 +1712,10 @@ def run_comparison_demo():
     print("-" * 40)
     
     sizes = [1, 10, 100, 1000, 10000]
-    trad_energies = []
-    box_energies = []
-    
-    for size in sizes:
-        # Tradicional
-        trad_scalable = TraditionalComputer()
-        for i in range(size):
-            trad_scalable.multiply(i+1, 40)
-        trad_energies.append(trad_scalable.total_energy)
-        
-        # Caja volumétrica
-        box_scalable = VolumetricBox()
-        for i in range(size):
-            box_scalable.place_value(i+1, x=i%100, y=i//100, level=1)
-            box_scalable.shift_level(i%100, i//100, 1, 2)
-        box_energies.append(box_scalable.total_energy)
+    # Cada (tamaño, modelo, semilla) corre en su propio proceso
+    sweep = run_scalability_sweep(sizes)
+    trad_energies = sweep["trad_energies"]
+    box_energies = sweep["box_energies"]
     
     print("Nº ops | Tradicional (pJ) | Caja (pJ) | Ratio")
     print("-" * 50)
@@ -269,38 +1727,17 @@ def run_comparison_demo():
     print("\n\n4. VISUALIZACIÓN DE VENTAJA ENERGÉTICA")
     print("-" * 40)
     
-    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-    
-    # Gráfico 1: Energía por número de operaciones
-    axes[0].plot(sizes, trad_energies, 'r-', linewidth=2, label='Tradicional (Von Neumann)')
-    axes[0].plot(sizes, box_energies, 'b-', linewidth=2, label='Caja Volumétrica')
-    axes[0].set_xscale('log')
-    axes[0].set_yscale('log')
-    axes[0].set_xlabel('Número de Multiplicaciones')
-    axes[0].set_ylabel('Energía (picojoules)')
-    axes[0].set_title('Consumo Energético: Escalabilidad')
-    axes[0].grid(True, alpha=0.3)
-    axes[0].legend()
-    
-    # Gráfico 2: Ratio de eficiencia
-    ratios = [t/b for t, b in zip(trad_energies, box_energies)]
-    axes[1].bar(range(len(sizes)), ratios, color='green', alpha=0.7)
-    axes[1].set_xlabel('Número de Operaciones (escala log)')
-    axes[1].set_ylabel('Ratio de Eficiencia (x veces)')
-    axes[1].set_title('Ventaja de Caja Volumétrica')
-    axes[1].set_xticks(range(len(sizes)))
-    axes[1].set_xticklabels([str(s) for s in sizes])
-    axes[1].grid(True, alpha=0.3, axis='y')
-    
-    # Añadir valores encima de las barras
-    for i, ratio in enumerate(ratios):
-        axes[1].text(i, ratio + 0.1, f'{ratio:.0f}x', ha='center', va='bottom')
-    
-    plt.tight_layout()
-    
-    # Guardar gráfico
-    plt.savefig('efficiency_comparison.png', dpi=150, bbox_inches='tight')
-    print(f"✓ Gráfico guardado como 'efficiency_comparison.png'")
+    report_thread = None
+    if not plot:
+        print("(omitida: modo sin gráficos)")
+    elif background:
+        # El gráfico se renderiza en segundo plano mientras sigue la demo
+        report_thread = render_report_async(sizes, trad_energies, box_energies,
+                                            REPORT_PATH)
+        print(f"… Gráfico renderizándose en segundo plano ('{REPORT_PATH}')")
+    else:
+        render_report(sizes, trad_energies, box_energies, REPORT_PATH, show=show)
+        print(f"✓ Gráfico guardado como '{REPORT_PATH}'")
     
     # ========== CONCLUSIÓN ==========
     print("\n" + "=" * 70)
@@ -334,18 +1771,21 @@ def run_comparison_demo():
     print("  • Ontological Storage (principio): https://github.com/cerbrisa-spatial/ontological-storage")
     print("  • Spatial Logic Protocol (implementación): https://github.com/cerbrisa-spatial/SPATIAL-LOGIC-PROTOCOL")
     
-    plt.show()
+    if plot and show and not background:
+        import matplotlib.pyplot as plt
+        plt.show()
     
     return {
         "traditional_energy_pj": trad_batch_stats['total_energy_pj'],
         "box_energy_pj": box_batch_stats['total_energy_pj'],
         "efficiency_ratio": efficiency_ratio,
         "traditional_operations": trad_batch_stats.get('operations_by_type', {}),
-        "box_operations": box_batch_stats
+        "box_operations": box_batch_stats,
+        "report_thread": report_thread
     }
 
 # ============================================================================
-# 4. BENCHMARK AVANZADO PARA DESARROLLADORES
+# 5. BENCHMARK AVANZADO PARA DESARROLLADORES
 # ============================================================================
 
 def advanced_benchmark():
@@ -407,8 +1847,18 @@ def advanced_benchmark():
 if __name__ == "__main__":
     print("Iniciando demostración de eficiencia de Caja Volumétrica...")
     
+    parser = argparse.ArgumentParser(description="Demostración de eficiencia de Caja Volumétrica")
+    parser.add_argument("--no-plot", action="store_true",
+                        help="no generar gráficos (no importa matplotlib)")
+    parser.add_argument("--no-show", action="store_true",
+                        help="guardar el PNG sin abrir ventana (servidores)")
+    parser.add_argument("--background-plot", action="store_true",
+                        help="renderizar el PNG en un hilo de fondo sin bloquear")
+    args = parser.parse_args()
+    
     # Ejecutar demostración principal
-    results = run_comparison_demo()
+    results = run_comparison_demo(plot=not args.no_plot, show=not args.no_show,
+                                  background=args.background_plot)
     
     # Ejecutar benchmark avanzado
     advanced_benchmark()
@@ -426,3 +1876,6 @@ if __name__ == "__main__":
     print("  • Port este modelo a otros lenguajes (Rust, C++, JS)")
     print("  • Comparar con implementaciones reales en FPGA")
     print("  • Modelar sistemas completos (ej: pipeline de procesamiento)")
+    
+    if results["report_thread"] is not None:
+        results["report_thread"].join()
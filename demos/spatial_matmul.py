@@ -0,0 +1,267 @@
+"""
+SPATIAL MATMUL: Matrix multiplication as a series of level shifts
+Each product A[i,k] × B[k,j] is modeled as shifting A[i,k] to a level whose
+factor is B[k,j] (one PHYSICAL_SHIFT + one READ), followed by accumulation
+(one INTEGER_ADD per partial sum). The spatial path really runs those
+shifts through a VolumetricBox, block by block; the fused path computes the
+same blocks with np.dot and charges the energy the model assigns to them.
+Both are benchmarked against TraditionalComputer and np.matmul.
+
+Usage:
+    python spatial_matmul.py                        # sizes 32..1024
+    python spatial_matmul.py --sizes 1024 2048 4096 --output matmul.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from efficiency_demo import BernoulliMiss, EnergyCost, TraditionalComputer, VolumetricBox
+
+# ============================================================================
+# 1. MOTOR DE MULTIPLICACIÓN POR DESPLAZAMIENTOS DE NIVEL
+# ============================================================================
+
+class SpatialMatmulEngine:
+    """
+    C = A @ B descompuesto en desplazamientos de nivel más acumulación,
+    por bloques: cada sub-problema es un bloque block × block de C.
+
+    fused=False (por defecto) ejecuta el modelo espacial. Para cada bloque
+    de columnas j0..j1 y cada k, la caja de trabajo tiene el nivel 1 como
+    identidad y los niveles 2 + jj con factor B[k, j0 + jj] (a lo sumo
+    block + 1 niveles). Para cada bloque de filas, A[i0:i1, k] se coloca
+    en el nivel 1 y un batch_shift por columna del bloque lo lleva a su
+    nivel; lo leído se acumula en C[i0:i1, j0:j1]. La energía la cobran
+    los propios batch_shift más un ACCUMULATE por suma realizada, y se
+    vuelca al ledger de `box` (cuyas celdas y niveles no se tocan).
+
+    fused=True calcula cada bloque con np.dot (mucho más rápido) y cobra
+    en `box`, por bloque, la energía que el modelo espacial asigna a ese
+    bloque (los mismos PHYSICAL_SHIFT, READ y ACCUMULATE), sin ejecutar
+    los desplazamientos.
+    """
+
+    def __init__(self, box: VolumetricBox = None, energy: EnergyCost = None,
+                 block: int = 256):
+        # La caja aporta los costos de shift/lectura y el ledger de energía
+        self.box = box or VolumetricBox(accounting="counters")
+        self.energy = energy or EnergyCost()
+        self.block = block
+
+    def matmul(self, a, b, fused: bool = False, out_level: int = None) -> np.ndarray:
+        a = np.asarray(a, dtype=float)
+        b = np.asarray(b, dtype=float)
+        if a.ndim != 2 or b.ndim != 2 or a.shape[1] != b.shape[0]:
+            raise ValueError(f"dimensiones incompatibles: {a.shape} @ {b.shape}")
+        out = self._blocked_dot(a, b) if fused else self._shift_matmul(a, b)
+        if out_level is not None:
+            self.box.set_plane(out_level, out)
+        return out
+
+    def _blocked_dot(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        rows, inner = a.shape
+        cols = b.shape[1]
+        out = np.zeros((rows, cols))
+        block = self.block
+        box = self.box
+        for i0 in range(0, rows, block):
+            i1 = min(rows, i0 + block)
+            for k0 in range(0, inner, block):
+                k1 = min(inner, k0 + block)
+                for j0 in range(0, cols, block):
+                    j1 = min(cols, j0 + block)
+                    out[i0:i1, j0:j1] += a[i0:i1, k0:k1] @ b[k0:k1, j0:j1]
+                    # Energía del modelo para este bloque: un shift + una
+                    # lectura por producto, una suma por producto salvo el
+                    # primero de cada C[i, j]
+                    products = (i1 - i0) * (k1 - k0) * (j1 - j0)
+                    additions = products - ((i1 - i0) * (j1 - j0) if k0 == 0 else 0)
+                    box._add_energy_bulk("PHYSICAL_SHIFT", box.energy_cost_per_shift, products)
+                    box._add_energy_bulk("READ_TRANSFORMED_VALUE", box.energy_cost_per_read,
+                                         products)
+                    box._add_energy_bulk("ACCUMULATE", self.energy.INTEGER_ADD, additions)
+        return out
+
+    def _shift_matmul(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        rows, inner = a.shape
+        cols = b.shape[1]
+        out = np.zeros((rows, cols))
+        block = self.block
+        scratch = VolumetricBox(storage="dense", accounting="counters")
+        scratch.energy_cost_per_shift = self.box.energy_cost_per_shift
+        scratch.energy_cost_per_read = self.box.energy_cost_per_read
+        # Un bloque de filas ocupa la columna x = 0 de la caja de trabajo
+        column = np.column_stack((np.zeros(min(rows, block), dtype=np.int64),
+                                  np.arange(min(rows, block))))
+
+        for j0 in range(0, cols, block):
+            j1 = min(cols, j0 + block)
+            for k in range(inner):
+                # Nivel 1 = identidad, nivel 2 + jj = factor B[k, j0 + jj]
+                scratch.levels = {1: 1.0, **{2 + jj: factor
+                                             for jj, factor in enumerate(b[k, j0:j1].tolist())}}
+                for i0 in range(0, rows, block):
+                    i1 = min(rows, i0 + block)
+                    positions = column[:i1 - i0]
+                    scratch.batch_place(a[i0:i1, k], positions, level=1)
+                    tile = out[i0:i1]
+                    for jj in range(j1 - j0):
+                        tile[:, j0 + jj] += scratch.batch_shift(positions, 1, 2 + jj)
+                    if k > 0:
+                        scratch._add_energy_bulk("ACCUMULATE", self.energy.INTEGER_ADD,
+                                                 (i1 - i0) * (j1 - j0))
+
+        for operation, count in scratch.ledger.counts.items():
+            cost = scratch.ledger.energy_by_type[operation] / count
+            self.box._add_energy_bulk(operation, cost, count)
+        return out
+
+
+def spatial_matmul_energy(rows: int, inner: int, cols: int, box: VolumetricBox = None,
+                          energy: EnergyCost = None) -> float:
+    """Energía (pJ) que el modelo espacial cobra por rows × inner @ inner × cols, sin ejecutarlo"""
+    box = box or VolumetricBox(accounting="counters")
+    energy = energy or EnergyCost()
+    products = rows * inner * cols
+    additions = rows * cols * max(0, inner - 1)
+    return (products * (box.energy_cost_per_shift + box.energy_cost_per_read)
+            + additions * energy.INTEGER_ADD)
+
+# ============================================================================
+# 2. REFERENCIA TRADICIONAL
+# ============================================================================
+
+def traditional_matmul(computer: TraditionalComputer, a, b) -> np.ndarray:
+    """Triple bucle con TraditionalComputer.multiply (solo tamaños pequeños)"""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    rows, inner = a.shape
+    cols = b.shape[1]
+    out = np.zeros((rows, cols))
+    add_cost = computer.energy.INTEGER_ADD
+    for i in range(rows):
+        for j in range(cols):
+            total = computer.multiply(a[i, 0], b[0, j])
+            for k in range(1, inner):
+                total += computer.multiply(a[i, k], b[k, j])
+                computer._add_energy("INTEGER_ADD", add_cost)
+            out[i, j] = total
+    return out
+
+
+def traditional_matmul_energy(rows: int, inner: int, cols: int,
+                              energy: EnergyCost = None, miss_rate: float = 0.2) -> float:
+    """Energía esperada (pJ) del modelo tradicional, sin ejecutarlo"""
+    energy = energy or EnergyCost()
+    computer = TraditionalComputer(energy, accounting="counters", miss_model=BernoulliMiss(miss_rate))
+    products = rows * inner * cols
+    additions = rows * cols * max(0, inner - 1)
+    return computer.expected_energy(products) + additions * energy.INTEGER_ADD
+
+# ============================================================================
+# 3. BENCHMARK
+# ============================================================================
+
+def _best_time(function, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_matmul_benchmark(sizes: List[int], block: int = 256, repeats: int = 3,
+                         shift_max_size: int = 64, trad_max_size: int = 32,
+                         seed: int = 0) -> List[Dict]:
+    """
+    Para cada n: tiempo de np.matmul, de la versión fusionada (np.dot por
+    bloques), del modelo espacial por desplazamientos (solo hasta
+    shift_max_size: n² batch_shift) y del modelo tradicional (solo hasta
+    trad_max_size: es un triple bucle en Python). La energía espacial es la
+    cobrada por la ejecución por desplazamientos cuando se hizo
+    ("measured") y, si no, la del modelo sin ejecutar ("estimated").
+    Tiempos en segundos (mejor de `repeats`).
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for n in sizes:
+        a = rng.standard_normal((n, n))
+        b = rng.standard_normal((n, n))
+        expected = np.matmul(a, b)
+
+        engine = SpatialMatmulEngine(block=block)
+        row = {
+            "size": n,
+            "block": block,
+            "numpy_s": _best_time(lambda: np.matmul(a, b), repeats),
+            "blocked_dot_s": _best_time(lambda: engine.matmul(a, b, fused=True), repeats),
+            "spatial_shift_s": None,
+            "traditional_s": None,
+            "max_abs_error": None,
+        }
+        if n <= shift_max_size:
+            engine = SpatialMatmulEngine(block=block)
+            start = time.perf_counter()
+            result = engine.matmul(a, b)
+            row["spatial_shift_s"] = time.perf_counter() - start
+            row["max_abs_error"] = float(np.max(np.abs(result - expected)))
+            row["spatial_energy_pj"] = engine.box.total_energy
+            row["spatial_energy_source"] = "measured"
+        else:
+            row["spatial_energy_pj"] = spatial_matmul_energy(n, n, n, engine.box)
+            row["spatial_energy_source"] = "estimated"
+        if n <= trad_max_size:
+            row["traditional_s"] = _best_time(
+                lambda: traditional_matmul(TraditionalComputer(accounting="counters"), a, b), 1)
+
+        row["traditional_energy_pj"] = traditional_matmul_energy(n, n, n)
+        row["energy_ratio"] = row["traditional_energy_pj"] / row["spatial_energy_pj"]
+        rows.append(row)
+    return rows
+
+
+def print_matmul_report(rows: List[Dict]):
+    def fmt(value):
+        return f"{value:10.4f}" if value is not None else f"{'—':>10s}"
+
+    print(f"{'n':>6s} {'np.matmul':>10s} {'np.dot blq':>10s} {'shifts':>10s} {'trad':>10s} "
+          f"{'E caja (pJ)':>15s} {'E trad (pJ)':>14s} {'ratio':>7s}")
+    print("-" * 91)
+    for r in rows:
+        mark = "" if r["spatial_energy_source"] == "measured" else "*"
+        print(f"{r['size']:6d} {fmt(r['numpy_s'])} {fmt(r['blocked_dot_s'])} "
+              f"{fmt(r['spatial_shift_s'])} {fmt(r['traditional_s'])} "
+              f"{r['spatial_energy_pj']:14.3e}{mark:1s} {r['traditional_energy_pj']:14.3e} "
+              f"{r['energy_ratio']:6.0f}x")
+    print("np.dot blq: bloques con np.dot, cobra la energía del modelo sin desplazar")
+    print("* energía estimada por el modelo (sin ejecutar los desplazamientos)")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de multiplicación matricial espacial")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 64, 256, 1024])
+    parser.add_argument("--block", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--shift-max-size", type=int, default=64)
+    parser.add_argument("--trad-max-size", type=int, default=32)
+    parser.add_argument("--output", help="guardar resultados JSON en este archivo")
+    args = parser.parse_args(argv)
+
+    rows = run_matmul_benchmark(args.sizes, block=args.block, repeats=args.repeats,
+                                shift_max_size=args.shift_max_size,
+                                trad_max_size=args.trad_max_size)
+    print_matmul_report(rows)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
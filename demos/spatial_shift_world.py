@@ -0,0 +1,331 @@
+"""
+SPATIAL SHIFT WORLD: Headless executor for the `/spatial_shift` command
+A block world backed by a VolumetricBox. `/spatial_shift <level> <radius>`
+(see MINECRAFT_COMMAND_API.md) moves every block within `radius` of the
+issuer to `level`. Cells are found through a precomputed grid-bucket index
+and queued commands are applied in tick batches.
+
+Usage:
+    python spatial_shift_world.py                        # sizes 128..1024
+    python spatial_shift_world.py --sizes 512 2048 --radius 32 --output world.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from efficiency_demo import VolumetricBox
+
+# ============================================================================
+# 1. ÍNDICE ESPACIAL POR BUCKETS DE GRILLA
+# ============================================================================
+
+class GridIndex:
+    """
+    Índice estático de celdas en buckets de bucket_size × bucket_size.
+    Las celdas se ordenan por bucket (id = by * n_bx + bx) en un layout CSR:
+    los buckets de una misma fila son contiguos, así una consulta de radio
+    lee un slice por fila de buckets en vez de recorrer todo el mundo.
+    """
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, bucket_size: int = 16):
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if xs.size and (xs.min() < 0 or ys.min() < 0):
+            raise ValueError("GridIndex solo admite coordenadas >= 0")
+        self.bucket_size = bucket_size
+        self.n_bx = int(xs.max()) // bucket_size + 1 if xs.size else 1
+        self.n_by = int(ys.max()) // bucket_size + 1 if ys.size else 1
+
+        bucket = (ys // bucket_size) * self.n_bx + xs // bucket_size
+        order = np.argsort(bucket, kind="stable")
+        self.xs = xs[order]
+        self.ys = ys[order]
+        # starts[b]:starts[b + 1] son las celdas del bucket b
+        self.starts = np.searchsorted(bucket[order], np.arange(self.n_bx * self.n_by + 1))
+
+    def __len__(self) -> int:
+        return self.xs.size
+
+    def query(self, cx: int, cy: int, radius: float) -> np.ndarray:
+        """Posiciones (en el orden del índice) de las celdas a distancia <= radius"""
+        size = self.bucket_size
+        bx0 = max(0, int((cx - radius) // size))
+        bx1 = min(self.n_bx - 1, int((cx + radius) // size))
+        by0 = max(0, int((cy - radius) // size))
+        by1 = min(self.n_by - 1, int((cy + radius) // size))
+        if bx0 > bx1 or by0 > by1:
+            return np.empty(0, dtype=np.int64)
+
+        rows = [np.arange(self.starts[by * self.n_bx + bx0], self.starts[by * self.n_bx + bx1 + 1])
+                for by in range(by0, by1 + 1)]
+        candidates = np.concatenate(rows)
+        dx = self.xs[candidates] - cx
+        dy = self.ys[candidates] - cy
+        return candidates[dx * dx + dy * dy <= radius * radius]
+
+# ============================================================================
+# 2. MUNDO Y COLA DE COMANDOS
+# ============================================================================
+
+COMMAND = "/spatial_shift"
+
+
+def parse_command(text: str) -> Tuple[int, float]:
+    """'/spatial_shift <level> <radius>' -> (level, radius)"""
+    parts = text.split()
+    if len(parts) != 3 or parts[0] != COMMAND:
+        raise ValueError(f"comando inválido: {text!r} (use '{COMMAND} <level> <radius>')")
+    level, radius = int(parts[1]), float(parts[2])
+    if radius < 0:
+        raise ValueError(f"radius negativo: {radius}")
+    return level, radius
+
+
+class SpatialShiftWorld:
+    """
+    Mundo de bloques sin interfaz gráfica. Cada bloque ocupa una celda (x, y)
+    y vive en un nivel de la caja; `level_map` guarda el nivel actual de cada
+    celda (0 = vacía).
+
+    Los comandos se encolan con submit() y tick() aplica hasta
+    `max_commands_per_tick` de una vez: las selecciones de todos se combinan
+    (si dos comandos tocan la misma celda gana el último) y cada par
+    (nivel actual, nivel destino) se ejecuta como un solo batch_shift. Una
+    celda movida dos veces en el mismo tick se desplaza una sola vez,
+    directamente a su nivel final.
+    """
+
+    def __init__(self, width: int, height: int, bucket_size: int = 16,
+                 storage: str = "dense", accounting: str = "counters",
+                 max_commands_per_tick: int = 256):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.max_commands_per_tick = max_commands_per_tick
+        self.box = VolumetricBox(storage=storage, accounting=accounting)
+        self.level_map = np.zeros((height, width), dtype=np.int8)
+        for level in self.box.levels:
+            self._fit_level(level)
+        self.queue = deque()
+        self._index = None
+        self.ticks = 0
+        self.commands_processed = 0
+        self.cells_shifted = 0
+
+    def _fit_level(self, level: int):
+        """Ensancha el dtype de level_map si `level` no cabe (int8 -> int16...)"""
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            limits = np.iinfo(dtype)
+            if limits.min <= level <= limits.max:
+                break
+        if np.dtype(dtype).itemsize > self.level_map.dtype.itemsize:
+            self.level_map = self.level_map.astype(dtype)
+
+    @property
+    def index(self) -> GridIndex:
+        """Índice de celdas ocupadas; se reconstruye solo si cambian los bloques"""
+        if self._index is None:
+            ys, xs = np.nonzero(self.level_map)
+            self._index = GridIndex(xs, ys, self.bucket_size)
+        return self._index
+
+    def add_blocks(self, xs, ys, values, level: int = 1):
+        """Coloca bloques (sin costo de energía, como batch_place)"""
+        if level not in self.box.levels:
+            raise KeyError(level)
+        self._fit_level(level)
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        self.box.batch_place(values, np.column_stack((xs, ys)), level=level)
+        self.level_map[ys, xs] = level
+        self._index = None
+
+    def fill(self, level: int = 1, seed: int = 0):
+        """Llena todo el mundo con bloques de valores aleatorios en `level`"""
+        ys, xs = np.mgrid[0:self.height, 0:self.width]
+        values = np.random.default_rng(seed).integers(1, 100, self.width * self.height)
+        self.add_blocks(xs.ravel(), ys.ravel(), values.astype(float), level)
+
+    def submit(self, command: str, x: int, y: int):
+        """Encola '/spatial_shift <level> <radius>' emitido desde (x, y)"""
+        level, radius = parse_command(command)
+        self.submit_shift(level, radius, x, y)
+
+    def submit_shift(self, level: int, radius: float, x: int, y: int):
+        if level not in self.box.levels:
+            raise ValueError(f"nivel desconocido: {level}")
+        # Al encolar, no en tick(): un nivel que no cabe perdería el lote
+        self._fit_level(level)
+        self.queue.append((level, radius, x, y))
+
+    def tick(self) -> int:
+        """Aplica un lote de comandos encolados; devuelve las celdas desplazadas"""
+        batch = [self.queue.popleft()
+                 for _ in range(min(self.max_commands_per_tick, len(self.queue)))]
+        if not batch:
+            return 0
+        index = self.index
+
+        selections = [index.query(x, y, radius) for _, radius, x, y in batch]
+        cells = np.concatenate(selections)
+        targets = np.repeat(np.array([level for level, _, _, _ in batch],
+                                     dtype=self.level_map.dtype),
+                            [len(sel) for sel in selections])
+        # El último comando que toca una celda decide su nivel final
+        cells, first = np.unique(cells[::-1], return_index=True)
+        targets = targets[::-1][first]
+
+        xs, ys = index.xs[cells], index.ys[cells]
+        current = self.level_map[ys, xs]
+        moving = current != targets
+        xs, ys, current, targets = xs[moving], ys[moving], current[moving], targets[moving]
+
+        for from_level in np.unique(current).tolist():
+            from_mask = current == from_level
+            for to_level in np.unique(targets[from_mask]).tolist():
+                mask = from_mask & (targets == to_level)
+                group_xs, group_ys = xs[mask], ys[mask]
+                self.box.batch_shift(np.column_stack((group_xs, group_ys)), from_level, to_level)
+                # El bloque deja su nivel anterior
+                self.box._delete_cells(group_xs, group_ys, from_level)
+        self.level_map[ys, xs] = targets
+
+        self.ticks += 1
+        self.commands_processed += len(batch)
+        self.cells_shifted += int(xs.size)
+        return int(xs.size)
+
+    def run(self) -> int:
+        """Procesa toda la cola; devuelve el número de ticks usados"""
+        ticks = 0
+        while self.queue:
+            self.tick()
+            ticks += 1
+        return ticks
+
+    def value_at(self, x: int, y: int) -> float:
+        """Valor del bloque en (x, y) en su nivel actual (None si está vacía)"""
+        level = int(self.level_map[y, x])
+        if level == 0:
+            return None
+        return float(self.box._read_cells(np.array([x]), np.array([y]), level)[0])
+
+    def get_stats(self) -> Dict:
+        return {
+            "ticks": self.ticks,
+            "commands_processed": self.commands_processed,
+            "cells_shifted": self.cells_shifted,
+            "pending_commands": len(self.queue),
+            "energy": self.box.get_stats(),
+        }
+
+# ============================================================================
+# 3. BENCHMARK
+# ============================================================================
+
+def scan_select(cells: Dict[tuple, int], cx: int, cy: int, radius: float) -> List[tuple]:
+    """Referencia: recorrer un dict {(x, y): nivel} completo por consulta"""
+    r2 = radius * radius
+    return [(x, y) for (x, y) in cells if (x - cx) ** 2 + (y - cy) ** 2 <= r2]
+
+
+def run_world_benchmark(sizes: List[int], commands: int = 2000, radius: float = 16,
+                        bucket_size: int = 16, max_commands_per_tick: int = 256,
+                        scan_max_size: int = 256, seed: int = 0) -> List[Dict]:
+    """
+    Para cada mundo size × size lleno: comandos/s y celdas desplazadas/s
+    procesando `commands` comandos aleatorios en ticks, más las consultas/s
+    del índice frente a recorrer un dict de celdas (solo hasta scan_max_size).
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for size in sizes:
+        world = SpatialShiftWorld(size, size, bucket_size=bucket_size,
+                                  max_commands_per_tick=max_commands_per_tick)
+        world.fill(seed=seed)
+        start = time.perf_counter()
+        world.index
+        index_s = time.perf_counter() - start
+
+        xs = rng.integers(0, size, commands)
+        ys = rng.integers(0, size, commands)
+        levels = rng.integers(1, 4, commands)
+        for level, x, y in zip(levels.tolist(), xs.tolist(), ys.tolist()):
+            world.submit_shift(level, radius, x, y)
+
+        start = time.perf_counter()
+        ticks = world.run()
+        elapsed = time.perf_counter() - start
+
+        probes = min(commands, 200)
+        start = time.perf_counter()
+        for x, y in zip(xs[:probes].tolist(), ys[:probes].tolist()):
+            world.index.query(x, y, radius)
+        query_s = (time.perf_counter() - start) / probes
+
+        row = {
+            "size": size,
+            "cells": size * size,
+            "commands": commands,
+            "radius": radius,
+            "ticks": ticks,
+            "index_build_s": index_s,
+            "commands_per_s": commands / elapsed,
+            "cells_shifted_per_s": world.cells_shifted / elapsed,
+            "index_queries_per_s": 1 / query_s,
+            "scan_queries_per_s": None,
+            "energy_pj": world.box.total_energy,
+        }
+        if size <= scan_max_size:
+            cells = {(x, y): 1 for y in range(size) for x in range(size)}
+            start = time.perf_counter()
+            for x, y in zip(xs[:20].tolist(), ys[:20].tolist()):
+                scan_select(cells, x, y, radius)
+            row["scan_queries_per_s"] = 20 / (time.perf_counter() - start)
+        rows.append(row)
+    return rows
+
+
+def print_world_report(rows: List[Dict]):
+    def fmt(value):
+        return f"{value:12,.0f}" if value is not None else f"{'—':>12s}"
+
+    print(f"{'mundo':>11s} {'ticks':>6s} {'comandos/s':>12s} {'celdas/s':>14s} "
+          f"{'índice q/s':>12s} {'dict q/s':>12s}")
+    print("-" * 73)
+    for r in rows:
+        print(f"{r['size']:5d}×{r['size']:<5d} {r['ticks']:6d} {fmt(r['commands_per_s'])} "
+              f"{r['cells_shifted_per_s']:14,.0f} {fmt(r['index_queries_per_s'])} "
+              f"{fmt(r['scan_queries_per_s'])}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de /spatial_shift en un mundo sin interfaz")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[128, 256, 512, 1024])
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--radius", type=float, default=16)
+    parser.add_argument("--bucket-size", type=int, default=16)
+    parser.add_argument("--per-tick", type=int, default=256, help="comandos por tick")
+    parser.add_argument("--scan-max-size", type=int, default=256)
+    parser.add_argument("--output", help="guardar resultados JSON en este archivo")
+    args = parser.parse_args(argv)
+
+    rows = run_world_benchmark(args.sizes, commands=args.commands, radius=args.radius,
+                               bucket_size=args.bucket_size,
+                               max_commands_per_tick=args.per_tick,
+                               scan_max_size=args.scan_max_size)
+    print_world_report(rows)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# SPATIAL LOGIC PROTOCOL - Instrumentation
+# Goal: Measuring what the simulated code paths really cost on the host:
+# process CPU time, wall time, RSS high-water mark and allocations, next to each
+# model's energy estimate.
+
+import functools
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Measurement:
+    """Accumulated cost of one instrumented code path."""
+
+    __slots__ = ("name", "calls", "cpu_s", "wall_s", "peak_rss_growth_bytes",
+                 "process_peak_rss_bytes", "alloc_blocks", "alloc_peak_bytes", "energy_pj")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.cpu_s = 0.0
+        self.wall_s = 0.0
+        # The OS only reports the process-wide high-water mark: a block is
+        # charged with how much it raised it (0 if it stayed below an earlier peak)
+        self.peak_rss_growth_bytes = None    # largest rise over one call
+        self.process_peak_rss_bytes = None   # process high-water mark after the last call
+        self.alloc_blocks = 0          # net Python blocks allocated (sys.getallocatedblocks)
+        self.alloc_peak_bytes = None   # tracemalloc peak, when traced
+        self.energy_pj = None          # modeled energy over the same calls
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Meter:
+    """
+    Collects measurements by name. Use it as a context manager
+
+        with meter.measure("batch_shift", energy_source=box):
+            box.batch_shift(positions, 1, 2)
+
+    or as a decorator (`@meter.instrument()`), or wrap methods of an existing
+    object with `meter.wrap(box, "batch_shift")`. When an energy source is
+    known (an object with `total_energy` or a callable returning pJ) the
+    modeled energy spent inside the block is recorded next to the real costs.
+
+    trace_allocations=True uses tracemalloc for the peak allocated bytes;
+    it slows the measured code down, so leave it off for timing runs, and
+    do not nest traced measurements (the peak is reset per block).
+    """
+
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        self.records = {}
+
+    def _record(self, name):
+        record = self.records.get(name)
+        if record is None:
+            record = self.records[name] = Measurement(name)
+        return record
+
+    @staticmethod
+    def _energy(source):
+        if source is None:
+            return None
+        return source() if callable(source) else source.total_energy
+
+    def measure(self, name, energy_source=None):
+        return _MeasureBlock(self, name, energy_source)
+
+    def instrument(self, name=None, energy_attr="total_energy"):
+        """
+        Decorator. On methods, the modeled energy is read from
+        `self.<energy_attr>` before and after each call when present.
+        """
+        def decorator(function):
+            label = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                owner = args[0] if args and hasattr(args[0], energy_attr) else None
+                source = (lambda: getattr(owner, energy_attr)) if owner is not None else None
+                with self.measure(label, energy_source=source):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def wrap(self, obj, *method_names, prefix=None):
+        """Instruments methods of a single object (the class is left untouched)."""
+        label = prefix or type(obj).__name__
+        source = obj if hasattr(obj, "total_energy") else None
+        for method_name in method_names:
+            method = getattr(obj, method_name)
+
+            def wrapper(*args, _method=method, _name=f"{label}.{method_name}", **kwargs):
+                with self.measure(_name, energy_source=source):
+                    return _method(*args, **kwargs)
+            functools.update_wrapper(wrapper, method)
+            setattr(obj, method_name, wrapper)
+        return obj
+
+    def report(self):
+        return [record.as_dict() for record in self.records.values()]
+
+    def print_report(self):
+        print(f"{'Code path':46s} {'calls':>7s} {'CPU ms':>9s} {'wall ms':>9s} "
+              f"{'+peak RSS MB':>12s} {'+blocks':>9s} {'model pJ':>12s}")
+        print("-" * 111)
+        for r in self.records.values():
+            growth = r.peak_rss_growth_bytes
+            rss = f"{growth / 2**20:12.1f}" if growth is not None else f"{'—':>12s}"
+            energy = f"{r.energy_pj:12.1f}" if r.energy_pj is not None else f"{'—':>12s}"
+            print(f"{r.name:46s} {r.calls:7d} {r.cpu_s * 1e3:9.2f} {r.wall_s * 1e3:9.2f} "
+                  f"{rss} {r.alloc_blocks:9d} {energy}")
+
+
+class _MeasureBlock:
+    """Context manager behind Meter.measure()."""
+
+    def __init__(self, meter, name, energy_source):
+        self.meter = meter
+        self.name = name
+        self.energy_source = energy_source
+
+    def __enter__(self):
+        meter = self.meter
+        self._started_tracing = False
+        if meter.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        self._energy = meter._energy(self.energy_source)
+        self._peak_rss = _peak_rss_bytes()
+        self._blocks = sys.getallocatedblocks()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        blocks = sys.getallocatedblocks() - self._blocks
+
+        record = self.meter._record(self.name)
+        record.calls += 1
+        record.cpu_s += cpu
+        record.wall_s += wall
+        record.alloc_blocks += blocks
+        peak_rss = _peak_rss_bytes()
+        if peak_rss is not None:
+            growth = peak_rss - self._peak_rss
+            record.peak_rss_growth_bytes = max(record.peak_rss_growth_bytes or 0, growth)
+            record.process_peak_rss_bytes = peak_rss
+        if self._energy is not None:
+            spent = self.meter._energy(self.energy_source) - self._energy
+            record.energy_pj = (record.energy_pj or 0.0) + spent
+        if self.meter.trace_allocations:
+            peak = tracemalloc.get_traced_memory()[1]
+            record.alloc_peak_bytes = max(record.alloc_peak_bytes or 0, peak)
+            if self._started_tracing:
+                tracemalloc.stop()
+        return False
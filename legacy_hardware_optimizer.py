@@ -1,42 +1,238 @@
 # SPATIAL LOGIC PROTOCOL - Legacy Hardware Adapter
 # This script simulates Ontological Storage on standard CPUs/GPUs.
 
+import contextlib
+import heapq
+import io
+import os
+import sys
 import time
+from collections import OrderedDict
+
+from instrumentation import Meter
+
+# Niveles de frío a caliente
+TIERS = ("L1_Identity", "L2_Relation", "L3_Universal")
+RESONANCE = {"L1_Identity": 1, "L2_Relation": 40, "L3_Universal": 1600}
+IMPORTANCE_TIERS = {"high": "L3_Universal", "medium": "L2_Relation"}  # resto -> L1
+
 
 class OntologicalOptimizer:
-    def __init__(self):
+    def __init__(self, capacities=None, policy="lru", promote_after=8, meter=None):
+        """
+        capacities: {tier: máximo de assets} (None o ausente = sin límite).
+        policy: "lru" o "lfu", elige la víctima cuando un nivel se llena; la
+                víctima baja un nivel (desde L1 se desaloja).
+        promote_after: accesos en un nivel antes de subir al siguiente.
+        meter: instrumentation.Meter que acumula los costos medidos.
+        """
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"policy desconocida: {policy!r} (use 'lru' o 'lfu')")
         # Mapeo de Niveles en la RAM actual
-        self.grid = {
-            "L1_Identity": [],   # Datos base (x1)
-            "L2_Relation": [],   # Contexto (x40)
-            "L3_Universal": []   # Lógica pura (x1600)
-        }
+        # Cada nivel: asset -> accesos en ese nivel, en orden de uso (LRU primero)
+        self.grid = {tier: OrderedDict() for tier in TIERS}
+        self.tier_of = {}   # Índice hash asset -> nivel, búsqueda O(1)
+        self.capacities = {tier: (capacities or {}).get(tier) for tier in TIERS}
+        self.policy = policy
+        self.promote_after = promote_after
+        self._lfu_heaps = {tier: [] for tier in TIERS}   # (accesos, tick, asset), perezoso
+        self._tick = 0
+        self.promotions = 0
+        self.demotions = 0
+        self.evictions = 0
+        self.meter = meter or Meter()
         print("🚀 Optimizer Active: Mapping Legacy RAM to Spatial Grid...")
 
+    # ---------- colocación ----------
+
+    def _push_lfu(self, tier, asset, count):
+        if self.policy == "lfu":
+            self._tick += 1
+            heap = self._lfu_heaps[tier]
+            heapq.heappush(heap, (count, self._tick, asset))
+            if len(heap) > 4 * len(self.grid[tier]) + 64:
+                # Compactar entradas obsoletas
+                self._lfu_heaps[tier] = heap = [(c, t, a) for c, t, a in heap
+                                                if self.grid[tier].get(a) == c]
+                heapq.heapify(heap)
+
+    def _victim(self, tier):
+        """Asset a desalojar de `tier` según la política"""
+        assets = self.grid[tier]
+        if self.policy == "lru":
+            return next(iter(assets))
+        heap = self._lfu_heaps[tier]
+        while heap:
+            count, _, asset = heapq.heappop(heap)
+            if assets.get(asset) == count:
+                return asset
+        return next(iter(assets))
+
+    def _remove(self, asset):
+        tier = self.tier_of.pop(asset)
+        del self.grid[tier][asset]
+        return tier
+
+    def _insert(self, asset, tier, count=0):
+        """Coloca asset en tier; si está lleno, la víctima baja un nivel (en cascada)"""
+        capacity = self.capacities[tier]
+        victim = None
+        if capacity is not None and len(self.grid[tier]) >= capacity:
+            if capacity == 0:
+                victim = asset
+            else:
+                victim = self._victim(tier)
+                self._remove(victim)
+        if victim != asset:
+            self.grid[tier][asset] = count
+            self.tier_of[asset] = tier
+            self._push_lfu(tier, asset, count)
+        if victim is not None:
+            level = TIERS.index(tier)
+            if level == 0:
+                self.evictions += 1
+            else:
+                self.demotions += 1
+                # Al bajar, el contador de accesos empieza de nuevo
+                self._insert(victim, TIERS[level - 1])
+
     def allocate_asset(self, asset_name, importance):
         """Asigna recursos del juego según su naturaleza, no su tamaño."""
-        if importance == "high":
-            # Lo mueve al 'Cilindro Central' de la memoria
-            self.grid["L3_Universal"].append(asset_name)
-            resonance = 1600
-        else:
-            self.grid["L1_Identity"].append(asset_name)
-            resonance = 1
-        
-        print(f"📦 Asset '{asset_name}' stored at Resonance x{resonance}")
-
-    def run_thermal_check(self):
-        """Simula la reducción de fricción electrónica."""
-        print("\n🌡️ Thermal Analysis:")
-        print("Type 0 Logic (Standard): 85°C | Fan Speed: 100%")
-        print("Type 1 Logic (Spatial):  42°C | Fan Speed: 0% (Silent)")
-        print("--- Logic-to-Heat Conversion: ACTIVE ---")
-
-# --- EXECUTION ---
-opt = OntologicalOptimizer()
-
-# Simulando la carga de un juego tipo Open World
-opt.allocate_asset("Physics_Engine", "high")
-opt.allocate_asset("Background_Rock_Texture", "low")
-
-opt.run_thermal_check()
+        with self.meter.measure("OntologicalOptimizer.allocate_asset"):
+            tier = self._allocate(asset_name, importance)
+        print(f"📦 Asset '{asset_name}' stored at Resonance x{RESONANCE[tier]}")
+
+    def _allocate(self, asset_name, importance):
+        # "high" va al 'Cilindro Central' de la memoria, "medium" al contexto
+        tier = IMPORTANCE_TIERS.get(importance, "L1_Identity")
+        if asset_name in self.tier_of:
+            self._remove(asset_name)
+        self._insert(asset_name, tier)
+        return tier
+
+    def allocate_assets(self, assets):
+        """Asignación masiva sin salida por asset: assets = [(nombre, importancia), ...]"""
+        count = 0
+        for asset_name, importance in assets:
+            self._allocate(asset_name, importance)
+            count += 1
+        return count
+
+    # ---------- consulta y movimiento ----------
+
+    def find(self, asset_name):
+        """Nivel donde está el asset (None si no está)"""
+        return self.tier_of.get(asset_name)
+
+    def access(self, asset_name):
+        """
+        Registra un acceso: el asset pasa a ser el más reciente de su nivel y
+        tras `promote_after` accesos sube al nivel siguiente. Devuelve el nivel.
+        """
+        tier = self.tier_of[asset_name]
+        assets = self.grid[tier]
+        count = assets[asset_name] + 1
+        assets[asset_name] = count
+        assets.move_to_end(asset_name)
+        self._push_lfu(tier, asset_name, count)
+
+        level = TIERS.index(tier)
+        if count >= self.promote_after and level < len(TIERS) - 1:
+            self._remove(asset_name)
+            self.promotions += 1
+            tier = TIERS[level + 1]
+            self._insert(asset_name, tier)
+        return tier
+
+    def move(self, asset_name, tier):
+        """Mueve un asset a otro nivel explícitamente"""
+        if tier not in self.grid:
+            raise KeyError(tier)
+        self._remove(asset_name)
+        self._insert(asset_name, tier)
+
+    def evict(self, asset_name):
+        """Saca un asset del grid"""
+        self._remove(asset_name)
+        self.evictions += 1
+
+    def rebalance(self):
+        """Aplica las capacidades actuales (p.ej. tras cambiarlas), de arriba hacia abajo"""
+        for level in range(len(TIERS) - 1, -1, -1):
+            tier = TIERS[level]
+            capacity = self.capacities[tier]
+            while capacity is not None and len(self.grid[tier]) > capacity:
+                victim = self._victim(tier)
+                self._remove(victim)
+                if level == 0:
+                    self.evictions += 1
+                else:
+                    self.demotions += 1
+                    self._insert(victim, TIERS[level - 1])
+
+    def tier_stats(self):
+        return {
+            "assets": {tier: len(self.grid[tier]) for tier in TIERS},
+            "capacities": dict(self.capacities),
+            "promotions": self.promotions,
+            "demotions": self.demotions,
+            "evictions": self.evictions,
+        }
+
+    def run_thermal_check(self, size=100_000):
+        """
+        Mide en este equipo el costo real (CPU, tiempo, cuánto sube el pico de
+        RSS y bloques asignados) de las rutas de cómputo de cada modelo y lo
+        reporta junto a la energía que el modelo estima para el mismo trabajo.
+        """
+        self._profile_models(size)
+        print("\n🌡️ Thermal Analysis (measured on this host):")
+        self.meter.print_report()
+
+    def _profile_models(self, size):
+        meter = self.meter
+
+        # Colocación: allocate_asset sobre un optimizador auxiliar (sin salida)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scratch = OntologicalOptimizer(meter=meter)
+            for i in range(min(size, 10_000)):
+                scratch.allocate_asset(f"asset_{i}", ("high", "medium", "low")[i % 3])
+
+        # Contenedor volumétrico: una tarea por llamada
+        from volumetric_box_demo import SpatialContainer
+        container = SpatialContainer()
+        container.register_boxes(["AI_Neural_Engine"], 3)
+        with meter.measure(f"SpatialContainer.process_task (x{size})"):
+            for i in range(size):
+                container.process_task("AI_Neural_Engine", i)
+
+        # Modelos de energía de demos/ (requieren numpy)
+        demos = os.path.join(os.path.dirname(os.path.abspath(__file__)), "demos")
+        if demos not in sys.path:
+            sys.path.insert(0, demos)
+        try:
+            from efficiency_demo import TraditionalComputer, VolumetricBox
+        except ImportError as error:
+            print(f"(modelos de demos/ no medidos: {error})")
+            return
+        values = [float(i) for i in range(size)]
+        computer = TraditionalComputer(accounting="counters")
+        with meter.measure(f"TraditionalComputer.batch_multiply (n={size})",
+                           energy_source=computer):
+            computer.batch_multiply(values, 40)
+
+        box = VolumetricBox(storage="dense", accounting="counters")
+        positions = [(i % 1024, i // 1024) for i in range(size)]
+        box.batch_place(values, positions, 1)
+        with meter.measure(f"VolumetricBox.batch_shift (n={size})", energy_source=box):
+            box.batch_shift(positions, 1, 2)
+
+if __name__ == "__main__":
+    # --- EXECUTION ---
+    opt = OntologicalOptimizer()
+
+    # Simulando la carga de un juego tipo Open World
+    opt.allocate_asset("Physics_Engine", "high")
+    opt.allocate_asset("Background_Rock_Texture", "low")
+
+    opt.run_thermal_check()
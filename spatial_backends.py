@@ -0,0 +1,251 @@
+# SPATIAL LOGIC PROTOCOL - Compute backends
+# Goal: One "value x level factor" kernel shared by Type1Grid, SpatialContainer
+# and VolumetricBox, running on whatever is installed: numba, NumPy or plain Python.
+#
+# Selection: get_backend(name) with name in "python", "numpy", "numba" or
+# "auto" (the default: NumPy when installed, else Python). numba is never
+# picked automatically: it JIT-compiles on first use. The SPATIAL_BACKEND
+# environment variable overrides the default for the whole process.
+#
+#   python spatial_backends.py   # conformance check + timings of every backend
+
+import importlib.util
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # Only the Python backend is available
+    np = None
+
+ENV_VAR = "SPATIAL_BACKEND"
+
+
+class PythonBackend:
+    """Reference backend: plain Python arithmetic, returns lists."""
+
+    name = "python"
+
+    def scale(self, value, factor):
+        return value * factor
+
+    def scale_many(self, values, factors):
+        """values[i] * factors[i] (factors may be a single number)."""
+        values = values.tolist() if hasattr(values, "tolist") else values
+        if isinstance(factors, (int, float)) or not hasattr(factors, "__len__"):
+            return [value * factors for value in values]
+        factors = factors.tolist() if hasattr(factors, "tolist") else factors
+        return [value * factor for value, factor in zip(values, factors)]
+
+
+class NumpyBackend(PythonBackend):
+    """
+    Vectorized backend: bulk calls are one NumPy operation. Single values
+    stay on the Python path, which is faster than a 0-d array round trip.
+    Integer products that could overflow the array dtype are computed on
+    object arrays instead, so they match Python's exact integers.
+    """
+
+    name = "numpy"
+
+    def scale_many(self, values, factors):
+        values, factors = _exact_operands(np.asarray(values), np.asarray(factors))
+        return np.multiply(values, factors)
+
+
+class NumbaBackend(NumpyBackend):
+    """JIT backend: bulk calls run a compiled loop (compiled per dtype on first use)."""
+
+    name = "numba"
+
+    def __init__(self):
+        import numba  # Imported here: loading numba takes longer than the rest of this module
+        self._scale_scalar = numba.njit(cache=True)(_scale_scalar_kernel)
+        self._scale_array = numba.njit(cache=True)(_scale_array_kernel)
+
+    def scale_many(self, values, factors):
+        values, factors = _exact_operands(np.asarray(values), np.asarray(factors))
+        if values.dtype == object or factors.dtype == object:
+            return super().scale_many(values, factors)
+        shape = np.broadcast_shapes(values.shape, factors.shape)
+        if factors.ndim == 0:
+            out = self._scale_scalar(np.ascontiguousarray(values).reshape(-1), factors[()])
+        else:
+            values, factors = np.broadcast_arrays(values, factors)
+            out = self._scale_array(np.ascontiguousarray(values).reshape(-1),
+                                    np.ascontiguousarray(factors).reshape(-1))
+        return out.reshape(shape)
+
+
+def _exact_operands(values, factors):
+    """
+    values, factors as object arrays when both are integers and their
+    product may not fit the integer dtype NumPy would use (or would become
+    float, as uint64 x int64 does); unchanged otherwise.
+    """
+    if values.dtype.kind not in "iu" or factors.dtype.kind not in "iu":
+        return values, factors
+    if values.size and factors.size:
+        result = np.result_type(values, factors)
+        if result.kind in "iu":
+            bound = (max(-int(values.min()), int(values.max()))
+                     * max(-int(factors.min()), int(factors.max())))
+            if bound <= np.iinfo(result).max:
+                return values, factors
+    elif np.result_type(values, factors).kind in "iu":
+        return values, factors
+    return values.astype(object), factors.astype(object)
+
+
+def _scale_scalar_kernel(values, factor):
+    out = np.empty(values.shape[0], dtype=(values[:1] * factor).dtype)
+    for i in range(values.shape[0]):
+        out[i] = values[i] * factor
+    return out
+
+
+def _scale_array_kernel(values, factors):
+    out = np.empty(values.shape[0], dtype=(values[:1] * factors[:1]).dtype)
+    for i in range(values.shape[0]):
+        out[i] = values[i] * factors[i]
+    return out
+
+
+BACKENDS = {"python": PythonBackend, "numpy": NumpyBackend, "numba": NumbaBackend}
+_instances = {}
+
+
+def available_backends():
+    """Names of the backends usable in this environment, "auto" choice first."""
+    names = []
+    if np is not None:
+        names.append("numpy")
+        if importlib.util.find_spec("numba") is not None:
+            names.append("numba")
+    names.append("python")
+    return names
+
+
+def get_backend(name=None):
+    """
+    Backend instance by name. None means $SPATIAL_BACKEND, or "auto" when
+    it is unset; "auto" picks NumPy when installed and Python otherwise.
+    """
+    if name is None:
+        name = os.environ.get(ENV_VAR, "auto")
+    if not isinstance(name, str):
+        return name  # Already a backend instance
+    if name == "auto":
+        name = available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r} (use one of {sorted(BACKENDS)} or 'auto')")
+    if name not in available_backends():
+        raise ValueError(f"Backend {name!r} is not installed here "
+                         f"(available: {available_backends()})")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def check_conformance(names=None):
+    """
+    Runs the same inputs through every backend, first through the kernels
+    and then through the models that dispatch to them, and compares the
+    results with the Python reference value by value. Returns a list of
+    mismatch messages (empty when all backends agree).
+    """
+    names = names or available_backends()
+    reference = get_backend("python")
+    cases = [
+        ("int x int", [0, 1, -7, 2**40], 40),
+        ("int x int overflow", [2**60, -2**62, 3], 40),
+        ("int x int factors overflow", [3, 2**40], [2**40, 2**40]),
+        ("float x int", [0.5, -3.25, 1e300, 1e-300], 1600),
+        ("int x float", [1, 2, 3, -4], 0.025),
+        ("float x float", [0.1, 0.2, 0.3], 1 / 3),
+        ("per-value factors", [1.5, 2, -3, 10], [1, 40, 1600, 0.5]),
+        ("empty", [], 40),
+    ]
+    mismatches = []
+    for name in names:
+        backend = get_backend(name)
+        for label, values, factors in cases:
+            expected = reference.scale_many(values, factors)
+            got = backend.scale_many(values, factors)
+            got = got.tolist() if hasattr(got, "tolist") else list(got)
+            if got != expected:
+                mismatches.append(f"{name}: scale_many {label}: {got} != {expected}")
+            for i, value in enumerate(values):
+                factor = factors[i] if isinstance(factors, list) else factors
+                if backend.scale(value, factor) != reference.scale(value, factor):
+                    mismatches.append(f"{name}: scale {label} [{i}]")
+    mismatches.extend(_check_models(names))
+    return mismatches
+
+
+def _model_outputs(name):
+    """Outputs of the models that dispatch through the backend, as plain lists."""
+    import contextlib
+    import io
+    from Spatial_shift_demo import Type1Grid
+    from volumetric_box_demo import SpatialContainer
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        grid = Type1Grid(backend=name)
+    container = SpatialContainer(backend=name)
+    rows = container.register_boxes(["a", "b", "c"], [1, 2, 3])
+    data = [0, 5, -3, 7, 2**60]
+    outputs = {
+        "Type1Grid.get_value": [grid.get_value(d, level) for d in data for level in (1, 2)],
+        "SpatialContainer.process_task": [container.process_task(box_id, 2.5)
+                                          for box_id in ("a", "b", "c")],
+        "SpatialContainer.process_indexed": list(container.process_indexed(list(rows) * 2,
+                                                                           [1, 2, 3, 0.5, 7, -1])),
+        "SpatialContainer.process_indexed (int overflow)": list(
+            container.process_indexed(list(rows) * 2, [2**60, 2**62, -2**61, 7, 2**50, 3])),
+    }
+    if np is not None:
+        outputs["Type1Grid.get_values"] = grid.get_values(data, [1, 2, 2, 1, 2]).tolist()
+        demos = os.path.join(os.path.dirname(os.path.abspath(__file__)), "demos")
+        if demos not in sys.path:
+            sys.path.insert(0, demos)
+        from efficiency_demo import VolumetricBox
+        box = VolumetricBox(storage="dense", backend=name)
+        box.batch_place([1.5, 2, 3], [(0, 0), (1, 0), (2, 1)], level=1)
+        outputs["VolumetricBox.shift_level"] = [box.shift_level(0, 0, 1, 3)]
+        outputs["VolumetricBox.batch_shift"] = box.batch_shift([(0, 0), (1, 0), (2, 1)], 1, 2)
+    # Exact comparison: NumPy scalars become Python numbers, not floats
+    return {key: [v.item() if hasattr(v, "item") else v for v in values]
+            for key, values in outputs.items()}
+
+
+def _check_models(names):
+    expected = _model_outputs("python")
+    mismatches = []
+    for name in names:
+        for key, values in _model_outputs(name).items():
+            if values != expected[key]:
+                mismatches.append(f"{name}: {key}: {values} != {expected[key]}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    names = available_backends()
+    print(f"Backends available: {', '.join(names)} (auto -> {get_backend('auto').name})")
+
+    mismatches = check_conformance(names)
+    for message in mismatches:
+        print(f"  MISMATCH {message}")
+    print("Conformance: " + ("FAILED" if mismatches else "all backends agree"))
+
+    n = 1_000_000
+    values = np.arange(n, dtype=float) if np is not None else [float(i) for i in range(n)]
+    for name in names:
+        backend = get_backend(name)
+        backend.scale_many(values[:10], 40)  # Warm up (JIT compile)
+        start = time.perf_counter()
+        backend.scale_many(values, 40)
+        print(f"  {name:7s} scale_many x{n}: {(time.perf_counter() - start) * 1e3:8.2f} ms")
+
+    sys.exit(1 if mismatches else 0)
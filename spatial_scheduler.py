@@ -0,0 +1,194 @@
+# SPATIAL LOGIC PROTOCOL - Phase 2: Asyncio front end for Volumetric Containers
+# Goal: Serving many concurrent clients by micro-batching tasks per box.
+
+import asyncio
+import time
+from collections import deque
+
+
+class BoxLane:
+    """Bounded queue, worker task and counters for a single box."""
+
+    def __init__(self, box_id, row, max_queue, latency_window):
+        self.box_id = box_id
+        self.row = row
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.worker = None
+        self.processed = 0
+        self.batches = 0
+        self.max_batch_size = 0
+        self.latencies = deque(maxlen=latency_window)  # seconds, most recent tasks
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+        return {
+            "queue_depth": self.queue.qsize(),
+            "processed": self.processed,
+            "batches": self.batches,
+            "mean_batch_size": self.processed / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "latency_ms": {"p50": percentile(0.50), "p90": percentile(0.90),
+                           "p99": percentile(0.99)},
+        }
+
+
+class BoxScheduler:
+    """
+    Producers `await scheduler.submit(box_id, value)`. Requests for the same
+    box are collected for up to `max_latency` seconds (or `max_batch` items)
+    and run as one vectorized SpatialContainer.process_indexed call.
+    Each box has a queue of at most `max_queue` pending tasks: when it is
+    full, submit() waits, which pushes backpressure onto the producers.
+
+    Lanes belong to the event loop that created them: when submit() runs on a
+    different loop (e.g. a second asyncio.run()), the lanes are rebuilt. A
+    worker with nothing to do for `max_idle` seconds exits and is restarted
+    by the next submit(), so idle boxes keep no pending tasks around.
+    """
+
+    def __init__(self, container, max_batch=1024, max_latency=0.002, max_queue=10_000,
+                 latency_window=4096, max_idle=1.0):
+        self.container = container
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.max_queue = max_queue
+        self.latency_window = latency_window
+        self.max_idle = max_idle
+        self._lanes = {}
+        self._loop = None
+
+    def _check_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and workers of another (usually closed) loop cannot be reused
+            self._lanes.clear()
+            self._loop = loop
+        return loop
+
+    def _lane(self, box_id):
+        loop = self._check_loop()
+        lane = self._lanes.get(box_id)
+        if lane is None:
+            row = self.container._box_index[box_id]  # Unknown boxes fail in submit()
+            lane = BoxLane(box_id, row, self.max_queue, self.latency_window)
+            self._lanes[box_id] = lane
+        if lane.worker is None or lane.worker.done():
+            lane.worker = loop.create_task(self._run(lane))
+        return lane
+
+    async def submit(self, box_id, value):
+        """Queues one task and waits for its output."""
+        lane = self._lane(box_id)
+        future = asyncio.get_running_loop().create_future()
+        await lane.queue.put((value, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self, lane):
+        """Waits for one task, then gathers more until the batch or latency window is full."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = [await asyncio.wait_for(lane.queue.get(), self.max_idle)]
+                break
+            except asyncio.TimeoutError:
+                # A submit() may have queued a task while the timeout was being
+                # delivered: it saw this worker alive, so it started no other one
+                if lane.queue.empty():
+                    return None
+        deadline = loop.time() + self.max_latency
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(lane.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(lane.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self, lane):
+        while True:
+            batch = await self._collect(lane)
+            if batch is None:
+                return  # Idle: the next submit() starts a new worker
+            try:
+                outputs = self.container.process_indexed([lane.row] * len(batch),
+                                                         [value for value, _, _ in batch])
+                outputs = outputs.tolist() if hasattr(outputs, "tolist") else outputs
+            except Exception as error:
+                outputs, failure = None, error
+            else:
+                failure = None
+
+            done = time.perf_counter()
+            for i, (_, future, submitted) in enumerate(batch):
+                if not future.done():
+                    if failure is None:
+                        future.set_result(outputs[i])
+                    else:
+                        future.set_exception(failure)
+                lane.latencies.append(done - submitted)
+                lane.queue.task_done()
+
+            lane.processed += len(batch)
+            lane.batches += 1
+            lane.max_batch_size = max(lane.max_batch_size, len(batch))
+
+    def stats(self, box_id=None):
+        """Queue depth, batch sizes and latency percentiles, per box (or for one box)."""
+        if box_id is not None:
+            return self._lanes[box_id].stats()
+        return {box_id: lane.stats() for box_id, lane in self._lanes.items()}
+
+    async def close(self):
+        """
+        Waits for queued tasks to finish, stops the per-box workers and
+        detaches from the container (its next submit() creates a new scheduler).
+        """
+        self._check_loop()
+        for lane in self._lanes.values():
+            await lane.queue.join()
+        workers = [lane.worker for lane in self._lanes.values() if lane.worker is not None]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._lanes.clear()
+        if self.container._scheduler is self:
+            self.container._scheduler = None
+
+
+if __name__ == "__main__":
+    from volumetric_box_demo import SpatialContainer
+
+    async def main():
+        system = SpatialContainer()
+        system.register_boxes(["AI_Neural_Engine", "Physics_Engine"], [3, 2])
+        scheduler = system.configure_scheduler(max_batch=512, max_latency=0.001)
+
+        async def client(i):
+            box_id = "AI_Neural_Engine" if i % 2 else "Physics_Engine"
+            return await system.submit(box_id, i)
+
+        start = time.perf_counter()
+        outputs = await asyncio.gather(*(client(i) for i in range(20_000)))
+        elapsed = time.perf_counter() - start
+
+        print(f"📦 {len(outputs)} tasks from concurrent clients in {elapsed:.3f}s")
+        for box_id, stats in scheduler.stats().items():
+            print(f"  {box_id}: {stats['batches']} batches, "
+                  f"mean batch {stats['mean_batch_size']:.0f}, "
+                  f"p99 latency {stats['latency_ms']['p99']:.2f} ms")
+        await scheduler.close()
+
+    asyncio.run(main())
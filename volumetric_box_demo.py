@@ -1,36 +1,172 @@
 # SPATIAL LOGIC PROTOCOL - Phase 2: Volumetric Containerization
 # Goal: Saving energy on heavy tasks by using resonant coordinate volumes.
 
+from array import array
+from collections.abc import Mapping
+from numbers import Integral
+
+try:
+    import numpy as np
+except ImportError:  # Bulk paths fall back to pure Python
+    np = None
+
+from spatial_backends import get_backend
+
+
+class ActiveBoxesView(Mapping):
+    """Read-only mapping box_id -> {"level", "multiplier"} of a SpatialContainer."""
+
+    def __init__(self, container):
+        self._container = container
+
+    def __getitem__(self, box_id):
+        container = self._container
+        level = container._box_levels[container._box_index[box_id]]
+        return {"level": level, "multiplier": container.levels[level]}
+
+    def __iter__(self):
+        return iter(self._container._box_ids)
+
+    def __len__(self):
+        return len(self._container._box_ids)
+
+
 class SpatialContainer:
-    def __init__(self):
+    def __init__(self, backend=None):
         # Multipliers based on Z-Axis Resonance Levels
         self.levels = {1: 1, 2: 40, 3: 1600}
-        self.active_boxes = {}
+        # Interned box table: box_id -> row, row -> level
+        self._box_index = {}
+        self._box_ids = []
+        self._box_levels = array("q")
+        self._scheduler = None
+        # "value x multiplier" kernel: spatial_backends name or instance (None = runtime pick)
+        self.backend = get_backend(backend)
+
+    @property
+    def active_boxes(self):
+        """
+        Read-only view {box_id: {"level", "multiplier"}} over the box table.
+        Entries are built per lookup (O(1)); use create_virtual_box() or
+        register_boxes() to add or move boxes.
+        """
+        return ActiveBoxesView(self)
+
+    def _intern(self, box_id, level):
+        """Returns the row of box_id, adding it (or moving it to `level`)."""
+        row = self._box_index.get(box_id)
+        if row is None:
+            row = len(self._box_ids)
+            self._box_index[box_id] = row
+            self._box_ids.append(box_id)
+            self._box_levels.append(level)
+        else:
+            self._box_levels[row] = level
+        return row
 
     def create_virtual_box(self, box_id, level):
         """Allocates a 'Virtual Box' using Coordinate Volume instead of heavy simulation."""
-        self.active_boxes[box_id] = {
-            "level": level,
-            "multiplier": self.levels[level]
-        }
+        self.levels[level]  # Unknown levels fail before anything is allocated
+        self._intern(box_id, level)
         print(f"📦 Virtual Box '{box_id}' established at Level {level} (x{self.levels[level]} resonance).")
 
+    def register_boxes(self, box_ids, levels):
+        """
+        Allocates many boxes at once, without per-box output.
+        `levels` is a single level for all boxes or one level per box.
+        Returns the interned row of each box, usable with process_indexed().
+        """
+        box_ids = list(box_ids)
+        if isinstance(levels, Integral):  # Also NumPy integer scalars
+            levels = [int(levels)] * len(box_ids)
+        else:
+            levels = list(levels)
+            if len(levels) != len(box_ids):
+                raise ValueError("register_boxes needs one level per box_id")
+        for level in set(levels):
+            self.levels[level]  # Unknown levels fail before anything is allocated
+
+        start = len(self._box_ids)
+        if self._box_index.keys().isdisjoint(box_ids) and len(set(box_ids)) == len(box_ids):
+            # Fast path: all new, distinct ids
+            rows = range(start, start + len(box_ids))
+            self._box_index.update(zip(box_ids, rows))
+            self._box_ids.extend(box_ids)
+            self._box_levels.extend(levels)
+            rows = list(rows)
+        else:
+            rows = [self._intern(box_id, level) for box_id, level in zip(box_ids, levels)]
+        return np.asarray(rows, dtype=np.intp) if np is not None else rows
+
     def process_task(self, box_id, energy_input):
         """Executes a task within the spatial properties of the assigned box."""
-        box = self.active_boxes[box_id]
+        level = self._box_levels[self._box_index[box_id]]
         # In Type 1 Logic, the output is a result of the Box's position.
-        output = energy_input * box["multiplier"]
+        output = self.backend.scale(energy_input, self.levels[level])
         return output
 
-# --- EXECUTION ---
-system = SpatialContainer()
+    def process_tasks(self, box_ids, inputs):
+        """
+        Executes many tasks at once: box_ids[i] receives inputs[i].
+        Box ids are resolved to rows in one pass, then handled by
+        process_indexed(). Returns an ndarray (a list without numpy).
+        """
+        rows = list(map(self._box_index.__getitem__, box_ids))
+        return self.process_indexed(rows, inputs)
+
+    def process_indexed(self, rows, inputs):
+        """
+        Executes tasks addressed by interned row (see register_boxes).
+        Multipliers come from the row -> level array and the whole batch
+        is computed in a single vectorized step.
+        """
+        if np is None:
+            box_levels, levels = self._box_levels, self.levels
+            return self.backend.scale_many(inputs, [levels[box_levels[row]] for row in rows])
+
+        ordered_levels = sorted(self.levels)
+        keys = np.array(ordered_levels, dtype=np.int64)
+        factors = np.array([self.levels[level] for level in ordered_levels])
+        box_levels = np.frombuffer(self._box_levels, dtype=np.int64)[np.asarray(rows, dtype=np.intp)]
+        positions = np.minimum(np.searchsorted(keys, box_levels), max(0, len(keys) - 1))
+        if not len(keys) and len(box_levels):
+            raise KeyError(int(box_levels[0]))
+        missing = keys[positions] != box_levels
+        if missing.any():
+            # Same error as process_task for a box whose level was removed
+            raise KeyError(int(box_levels[missing][0]))
+        multipliers = factors[positions]
+        return np.asarray(self.backend.scale_many(inputs, multipliers))
+
+    def configure_scheduler(self, **options):
+        """
+        Creates the asyncio scheduler used by submit(); options are passed to
+        spatial_scheduler.BoxScheduler (max_batch, max_latency, max_queue...).
+        """
+        from spatial_scheduler import BoxScheduler
+        self._scheduler = BoxScheduler(self, **options)
+        return self._scheduler
+
+    async def submit(self, box_id, energy_input):
+        """
+        Queues a task for micro-batched execution and waits for its output.
+        Tasks for the same box are grouped into process_indexed() calls.
+        """
+        if self._scheduler is None:
+            self.configure_scheduler()
+        return await self._scheduler.submit(box_id, energy_input)
+
+
+if __name__ == "__main__":
+    # --- EXECUTION ---
+    system = SpatialContainer()
 
-# Creating a high-resonance box for a 'heavy' computation
-system.create_virtual_box(box_id="AI_Neural_Engine", level=3)
+    # Creating a high-resonance box for a 'heavy' computation
+    system.create_virtual_box(box_id="AI_Neural_Engine", level=3)
 
-# Processing data (10 units) in the Level 3 box
-final_output = system.process_task("AI_Neural_Engine", 10)
+    # Processing data (10 units) in the Level 3 box
+    final_output = system.process_task("AI_Neural_Engine", 10)
 
-print(f"\nTask Input: 10")
-print(f"Resonant Output in Box: {final_output}")
-print("--- Result achieved with ZERO CPU thermal cycles. ---")
+    print(f"\nTask Input: 10")
+    print(f"Resonant Output in Box: {final_output}")
+    print("--- Result achieved with ZERO CPU thermal cycles. ---")